@@ -0,0 +1,463 @@
+"""
+Offline analytics jobs for MES Connect.
+
+Network analytics builds one undirected graph out of accepted friendships
+and group memberships (groups are extra nodes linking their members), then
+computes connected components, the friend degree distribution and PageRank
+with a sparse power iteration. Results go to the graph_* summary tables
+read by the admin dashboard.
+
+Group recommendations score public groups for every user from group
+co-membership (item-to-item cosine similarity) plus department and batch
+affinity, and store each user's top picks in group_recommendations.
+
+Run with:  python analytics.py                   (network analytics)
+           python analytics.py --recommendations (group recommendations)
+           python analytics.py --benchmark       (synthetic 500k-edge graph)
+"""
+
+import itertools
+import sys
+import time
+
+import numpy as np
+
+from utils.database import get_db_connection
+
+PAGERANK_DAMPING = 0.85
+PAGERANK_TOLERANCE = 1e-8
+PAGERANK_MAX_ITER = 100
+TOP_CONNECTORS = 50
+
+RECOMMENDATIONS_PER_USER = 10
+SIMILAR_GROUPS = 20
+AFFINITY_GROUPS = 20
+DEPARTMENT_WEIGHT = 0.5
+BATCH_WEIGHT = 0.3
+AFFINITY_SMOOTHING = 5
+
+
+def _fetch_pairs(cursor, query, width=2):
+    """Run an integer query and return the rows as an (n, width) int array"""
+    cursor.execute(query)
+    flat = np.fromiter(itertools.chain.from_iterable(cursor), dtype=np.int64)
+    return flat.reshape(-1, width)
+
+
+def load_graph(conn):
+    """Load user ids, friendship edges and group membership edges"""
+    cursor = conn.cursor()
+    cursor.row_factory = None
+
+    cursor.execute("SELECT id FROM users WHERE role != 'admin'")
+    user_ids = np.fromiter((row[0] for row in cursor), dtype=np.int64)
+
+    friendships = _fetch_pairs(cursor, '''
+        SELECT user_id, connected_user_id FROM connections
+        WHERE status = 'accepted'
+    ''')
+    memberships = _fetch_pairs(cursor, '''
+        SELECT group_id, user_id FROM group_members
+        WHERE is_banned = 0
+    ''')
+
+    return user_ids, friendships, memberships
+
+
+def _neighbour_index(src, dst):
+    """Sort both edge directions by source for segmented reductions"""
+    heads = np.concatenate([src, dst])
+    tails = np.concatenate([dst, src])
+    order = np.argsort(heads, kind='stable')
+    heads, tails = heads[order], tails[order]
+    starts = np.flatnonzero(np.diff(heads, prepend=-1))
+    return heads, tails, starts
+
+
+def connected_components(num_nodes, src, dst):
+    """Label every node with the smallest node index in its component"""
+    labels = np.arange(num_nodes)
+    heads, tails, starts = _neighbour_index(src, dst)
+    if not len(heads):
+        return labels
+
+    nodes = heads[starts]
+    while True:
+        # Hook each node onto its smallest neighbouring label...
+        neighbour_min = np.minimum.reduceat(labels[tails], starts)
+        hooked = labels.copy()
+        hooked[nodes] = np.minimum(labels[nodes], neighbour_min)
+
+        # ...then shortcut label chains so long paths converge quickly
+        while True:
+            jumped = hooked[hooked]
+            if np.array_equal(jumped, hooked):
+                break
+            hooked = jumped
+
+        if np.array_equal(hooked, labels):
+            return labels
+        labels = hooked
+
+
+def pagerank(num_nodes, src, dst, damping=PAGERANK_DAMPING,
+             tol=PAGERANK_TOLERANCE, max_iter=PAGERANK_MAX_ITER):
+    """PageRank of an undirected graph by sparse power iteration"""
+    if num_nodes == 0:
+        return np.zeros(0)
+
+    heads = np.concatenate([src, dst])
+    tails = np.concatenate([dst, src])
+    degree = np.bincount(heads, minlength=num_nodes).astype(np.float64)
+    dangling = degree == 0
+    inv_degree = np.divide(1.0, degree, out=np.zeros(num_nodes), where=~dangling)
+
+    rank = np.full(num_nodes, 1.0 / num_nodes)
+    for _ in range(max_iter):
+        share = (rank * inv_degree)[heads]
+        updated = damping * np.bincount(tails, weights=share, minlength=num_nodes)
+        updated += (1.0 - damping + damping * rank[dangling].sum()) / num_nodes
+        delta = np.abs(updated - rank).sum()
+        rank = updated
+        if delta < tol:
+            break
+
+    return rank
+
+
+def analyze_graph(user_ids, friendships, memberships):
+    """Compute per-user and graph-level statistics from raw edge arrays"""
+    users = np.unique(np.concatenate([user_ids, friendships.ravel(), memberships[:, 1]]))
+    groups = np.unique(memberships[:, 0])
+    num_users = len(users)
+    num_nodes = num_users + len(groups)
+
+    # Map database ids onto dense node indexes (groups follow users)
+    friend_src = np.searchsorted(users, friendships[:, 0])
+    friend_dst = np.searchsorted(users, friendships[:, 1])
+    member_user = np.searchsorted(users, memberships[:, 1])
+    member_group = num_users + np.searchsorted(groups, memberships[:, 0])
+
+    src = np.concatenate([friend_src, member_user])
+    dst = np.concatenate([friend_dst, member_group])
+
+    labels = connected_components(num_nodes, src, dst)
+    ranks = pagerank(num_nodes, src, dst)
+
+    # Number components by user count, largest first
+    roots, component_of, sizes = np.unique(labels[:num_users], return_inverse=True,
+                                           return_counts=True)
+    by_size = np.argsort(-sizes, kind='stable')
+    component_id = np.empty_like(by_size)
+    component_id[by_size] = np.arange(1, len(by_size) + 1)
+    user_component = component_id[component_of]
+    group_roots = np.searchsorted(roots, labels[num_users:])
+    group_counts = np.bincount(component_id[group_roots], minlength=len(roots) + 1)
+
+    degree = np.bincount(np.concatenate([friend_src, friend_dst]), minlength=num_users)
+    group_count = np.bincount(member_user, minlength=num_users)
+    degree_values, degree_users = np.unique(degree, return_counts=True)
+
+    return {
+        'user_ids': users,
+        'component': user_component,
+        'degree': degree,
+        'group_count': group_count,
+        'pagerank': ranks[:num_users],
+        'component_sizes': sizes[by_size],
+        'component_groups': group_counts[1:],
+        'degree_distribution': (degree_values, degree_users),
+        'friendship_count': len(friendships),
+        'membership_count': len(memberships),
+    }
+
+
+def save_results(conn, result, duration_ms, top_n=TOP_CONNECTORS):
+    """Replace the graph_* summary tables with a fresh analytics run"""
+    cursor = conn.cursor()
+
+    connector_rank = np.zeros(len(result['user_ids']), dtype=np.int64)
+    top = np.argsort(-result['pagerank'], kind='stable')[:top_n]
+    connector_rank[top] = np.arange(1, len(top) + 1)
+
+    try:
+        cursor.execute("DELETE FROM graph_user_stats")
+        cursor.execute("DELETE FROM graph_components")
+        cursor.execute("DELETE FROM graph_degree_distribution")
+
+        cursor.executemany('''
+            INSERT INTO graph_user_stats (user_id, component_id, degree, group_count,
+                                          pagerank, connector_rank)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', zip(result['user_ids'].tolist(), result['component'].tolist(),
+                 result['degree'].tolist(), result['group_count'].tolist(),
+                 result['pagerank'].tolist(),
+                 [rank or None for rank in connector_rank.tolist()]))
+
+        cursor.executemany('''
+            INSERT INTO graph_components (component_id, user_count, group_count)
+            VALUES (?, ?, ?)
+        ''', zip(range(1, len(result['component_sizes']) + 1),
+                 result['component_sizes'].tolist(),
+                 result['component_groups'].tolist()))
+
+        degree_values, degree_users = result['degree_distribution']
+        cursor.executemany('''
+            INSERT INTO graph_degree_distribution (degree, user_count)
+            VALUES (?, ?)
+        ''', zip(degree_values.tolist(), degree_users.tolist()))
+
+        sizes = result['component_sizes']
+        cursor.execute('''
+            INSERT INTO graph_runs (user_count, friendship_count, membership_count,
+                                    component_count, largest_component, duration_ms)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (len(result['user_ids']), result['friendship_count'],
+              result['membership_count'], len(sizes),
+              int(sizes[0]) if len(sizes) else 0, duration_ms))
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def run_graph_analytics(top_n=TOP_CONNECTORS):
+    """Recompute network statistics from the live tables"""
+    started = time.perf_counter()
+    conn = get_db_connection()
+
+    try:
+        result = analyze_graph(*load_graph(conn))
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        save_results(conn, result, duration_ms, top_n)
+    finally:
+        conn.close()
+
+    return {
+        'users': len(result['user_ids']),
+        'components': len(result['component_sizes']),
+        'duration_ms': duration_ms,
+    }
+
+
+def benchmark(num_users=100_000, num_groups=2_000, num_friendships=400_000,
+              num_memberships=100_000, seed=42):
+    """Time analyze_graph on a synthetic graph (defaults give 500k edges)"""
+    rng = np.random.default_rng(seed)
+    user_ids = np.arange(1, num_users + 1)
+    friendships = rng.integers(1, num_users + 1, size=(num_friendships, 2))
+    memberships = np.column_stack([
+        rng.integers(1, num_groups + 1, size=num_memberships),
+        rng.integers(1, num_users + 1, size=num_memberships),
+    ])
+
+    started = time.perf_counter()
+    result = analyze_graph(user_ids, friendships, memberships)
+    elapsed = time.perf_counter() - started
+
+    print(f"Edges: {num_friendships + num_memberships:,} | "
+          f"Components: {len(result['component_sizes']):,} | "
+          f"Largest: {result['component_sizes'][0]:,} users | "
+          f"Time: {elapsed:.2f}s")
+    return elapsed
+
+
+def _segment_gather(keys, starts, counts):
+    """
+    Expand every entry of keys into the segment [starts[k], starts[k] + counts[k]).
+
+    Returns (owner, position): owner indexes into keys, position indexes
+    into the segmented arrays.
+    """
+    lengths = counts[keys]
+    owner = np.repeat(np.arange(len(keys)), lengths)
+    offsets = np.arange(len(owner)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return owner, starts[keys][owner] + offsets
+
+
+def _segments(sorted_keys, size):
+    """Start offsets and lengths of each key's run in a sorted key array"""
+    counts = np.bincount(sorted_keys, minlength=size)
+    return np.cumsum(counts) - counts, counts
+
+
+def _top_k_per_key(keys, scores, k):
+    """Indexes of the k best scores for each key, ordered by key then score"""
+    order = np.lexsort((-scores, keys))
+    sorted_keys = keys[order]
+    first = np.searchsorted(sorted_keys, sorted_keys)
+    return order[np.arange(len(order)) - first < k]
+
+
+def _similar_groups(member_user, member_group, num_users, num_groups, sizes):
+    """Top SIMILAR_GROUPS cosine neighbours of every group by co-membership"""
+    order = np.argsort(member_user, kind='stable')
+    users, groups = member_user[order], member_group[order]
+    starts, counts = _segments(users, num_users)
+
+    # Every ordered pair of groups sharing a member
+    owner, partner = _segment_gather(users, starts, counts)
+    left, right = groups[owner], groups[partner]
+    distinct = left != right
+    pairs, together = np.unique(left[distinct] * num_groups + right[distinct],
+                                return_counts=True)
+    source, target = pairs // num_groups, pairs % num_groups
+    similarity = together / np.sqrt(sizes[source] * sizes[target])
+
+    keep = _top_k_per_key(source, similarity, SIMILAR_GROUPS)
+    return source[keep], target[keep], similarity[keep]
+
+
+def _affinity_candidates(user_attr, member_user, member_group, num_groups, sizes, weight):
+    """Score the groups most popular with each user's department (or batch)"""
+    known = user_attr[member_user] >= 0
+    num_attrs = user_attr.max() + 1 if len(user_attr) else 0
+    if not known.any() or num_attrs <= 0:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, np.array([])
+
+    pairs, together = np.unique(user_attr[member_user[known]] * num_groups
+                                + member_group[known], return_counts=True)
+    attr, group = pairs // num_groups, pairs % num_groups
+    # Smoothed share so one-member groups do not score a perfect match
+    share = together / (sizes[group] + AFFINITY_SMOOTHING)
+
+    keep = _top_k_per_key(attr, share, AFFINITY_GROUPS)
+    attr, group, share = attr[keep], group[keep], share[keep]
+    starts, counts = _segments(attr, num_attrs)
+
+    users = np.flatnonzero(user_attr >= 0)
+    owner, position = _segment_gather(user_attr[users], starts, counts)
+    return users[owner], group[position], weight * share[position]
+
+
+def _encode(values):
+    """Dense integer codes for a list of labels (-1 for missing)"""
+    codes = {}
+    return np.array([codes.setdefault(value, len(codes)) if value else -1
+                     for value in values], dtype=np.int64)
+
+
+def compute_group_recommendations(user_ids, departments, batches, memberships,
+                                  public_group_ids, top_n=RECOMMENDATIONS_PER_USER):
+    """
+    Rank public groups for every user.
+
+    Only groups in public_group_ids are recommended (the caller leaves out
+    private and cohort groups).
+
+    memberships is an (n, 3) array of group_id, user_id, is_banned. Returns
+    parallel arrays of user ids, group ids, scores and 1-based ranks.
+    """
+    order = np.argsort(user_ids)
+    users = user_ids[order]
+    department_code = _encode([departments[i] for i in order])
+    batch_code = _encode([batches[i] for i in order])
+
+    known = np.isin(memberships[:, 1], users)
+    memberships = memberships[known]
+    groups = np.unique(np.concatenate([memberships[:, 0], public_group_ids]))
+    num_users, num_groups = len(users), len(groups)
+
+    all_user = np.searchsorted(users, memberships[:, 1])
+    all_group = np.searchsorted(groups, memberships[:, 0])
+    active = memberships[:, 2] == 0
+    member_user, member_group = all_user[active], all_group[active]
+    sizes = np.bincount(member_group, minlength=num_groups)
+
+    # Item-to-item: each of a user's groups votes for its nearest neighbours
+    source, target, similarity = _similar_groups(member_user, member_group,
+                                                 num_users, num_groups, sizes)
+    starts, counts = _segments(source, num_groups)
+    owner, position = _segment_gather(member_group, starts, counts)
+
+    candidates = [
+        (member_user[owner], target[position], similarity[position]),
+        _affinity_candidates(department_code, member_user, member_group,
+                             num_groups, sizes, DEPARTMENT_WEIGHT),
+        _affinity_candidates(batch_code, member_user, member_group,
+                             num_groups, sizes, BATCH_WEIGHT),
+    ]
+    cand_user = np.concatenate([c[0] for c in candidates])
+    cand_group = np.concatenate([c[1] for c in candidates])
+    cand_score = np.concatenate([c[2] for c in candidates])
+
+    keys, inverse = np.unique(cand_user * num_groups + cand_group, return_inverse=True)
+    scores = np.bincount(inverse, weights=cand_score, minlength=len(keys))
+    rec_user, rec_group = keys // num_groups, keys % num_groups
+
+    # Drop groups the user already belongs to (or is banned from) and private groups
+    joined = np.isin(keys, all_user * num_groups + all_group)
+    public = np.isin(groups[rec_group], public_group_ids)
+    eligible = ~joined & public
+    rec_user, rec_group, scores = rec_user[eligible], rec_group[eligible], scores[eligible]
+
+    keep = _top_k_per_key(rec_user, scores, top_n)
+    rec_user, rec_group, scores = rec_user[keep], rec_group[keep], scores[keep]
+    ranks = np.arange(len(keep)) - np.searchsorted(rec_user, rec_user) + 1
+
+    return users[rec_user], groups[rec_group], scores, ranks
+
+
+def run_group_recommendations(top_n=RECOMMENDATIONS_PER_USER):
+    """Recompute every user's recommended groups from the live tables"""
+    started = time.perf_counter()
+    conn = get_db_connection()
+
+    try:
+        cursor = conn.cursor()
+        cursor.row_factory = None
+
+        cursor.execute('''
+            SELECT u.id, s.department, s.batch
+            FROM users u
+            LEFT JOIN students s ON u.id = s.user_id
+            WHERE u.role != 'admin' AND u.is_active = 1
+        ''')
+        rows = cursor.fetchall()
+        user_ids = np.array([row[0] for row in rows], dtype=np.int64)
+        departments = [row[1] for row in rows]
+        batches = [row[2] for row in rows]
+
+        memberships = _fetch_pairs(cursor, '''
+            SELECT group_id, user_id, COALESCE(is_banned, 0) FROM group_members
+        ''', width=3)
+        # Cohort groups follow the students table (sync_cohort_groups), so
+        # they are never offered for joining
+        cursor.execute("SELECT id FROM groups WHERE is_public = 1 AND cohort_value IS NULL")
+        public_group_ids = np.fromiter((row[0] for row in cursor), dtype=np.int64)
+
+        rec_users, rec_groups, scores, ranks = compute_group_recommendations(
+            user_ids, departments, batches, memberships, public_group_ids, top_n)
+
+        cursor.execute("DELETE FROM group_recommendations")
+        cursor.executemany('''
+            INSERT INTO group_recommendations (user_id, rank, group_id, score)
+            VALUES (?, ?, ?, ?)
+        ''', zip(rec_users.tolist(), ranks.tolist(), rec_groups.tolist(), scores.tolist()))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    return {
+        'users': len(np.unique(rec_users)),
+        'recommendations': len(rec_users),
+        'duration_ms': int((time.perf_counter() - started) * 1000),
+    }
+
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark()
+    elif "--recommendations" in sys.argv:
+        summary = run_group_recommendations()
+        print(f"✅ Stored {summary['recommendations']} recommendations for "
+              f"{summary['users']} users ({summary['duration_ms']} ms)")
+    else:
+        summary = run_graph_analytics()
+        print(f"✅ Analysed {summary['users']} users in {summary['components']} "
+              f"components ({summary['duration_ms']} ms)")
@@ -1,9 +1,12 @@
 import streamlit as st
+import logging
 import sqlite3
-import hashlib
 import os
 from datetime import datetime
-from utils.database import init_db, get_db_connection
+from utils.database import init_db, get_db_connection, get_dashboard_snapshot, hash_password
+from utils.page_registry import page_registry, PageNotFoundError
+from utils.students import remove_export_file
+from utils.warmup import start_warmup
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -91,6 +94,16 @@ def load_css():
     </style>
     """, unsafe_allow_html=True)
 
+# Logging: Streamlit only sets up its own loggers, so without a handler here
+# the INFO reports of our modules (warm-up timings) would be dropped
+def setup_logging():
+    logger = logging.getLogger("utils")
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+
 # Session state initialization
 def init_session_state():
     if 'logged_in' not in st.session_state:
@@ -109,9 +122,6 @@ def init_session_state():
         st.session_state.profile_picture = None
 
 # Authentication functions
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
-
 def verify_login(username, password):
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -270,107 +280,53 @@ def show_dashboard():
         
         st.markdown("---")
         
-        # Navigation based on role
-        if st.session_state.user_role == 'student':
-            menu_options = ["Dashboard", "Profile", "Friends", "Chat", "Groups", "Confessions", "Events", "Settings"]
-            menu_icons = ["house", "person", "people", "chat", "group", "chat-heart", "calendar-event", "gear"]
-            
+        # Navigation based on role (only pages that exist on disk are listed)
+        role = st.session_state.user_role
+        menu_options = page_registry.labels(role)
+        
+        if role == 'student':
             selected = st.selectbox(
                 "Navigation",
                 menu_options,
                 index=0,
-                format_func=lambda x: f"{menu_icons[menu_options.index(x)]} {x}"
+                format_func=lambda x: f"{page_registry.icon(role, x)} {x}"
             )
-            
-            # Map selection to pages
-            page_map = {
-                "Dashboard": "pages/Student/1_Dashboard.py",
-                "Profile": "pages/Student/2_Profile.py",
-                "Friends": "pages/Student/3_Friends.py",
-                "Chat": "pages/Student/4_Chat.py",
-                "Groups": "pages/Student/5_Groups.py",
-                "Confessions": "pages/Student/6_Confessions.py",
-                "Events": "pages/Student/7_Events.py",
-                "Settings": "pages/Student/8_Settings.py"
-            }
-            
-        elif st.session_state.user_role == 'alumni':
-            menu_options = ["Dashboard", "Profile", "Networking", "Chat", "Groups", "Events", "Contributions", "Settings"]
-            selected = st.selectbox("Navigation", menu_options)
-            
-            page_map = {
-                "Dashboard": "pages/Alumni/1_Dashboard.py",
-                "Profile": "pages/Alumni/2_Profile.py",
-                "Networking": "pages/Alumni/3_Networking.py",
-                "Chat": "pages/Alumni/4_Chat.py",
-                "Groups": "pages/Alumni/5_Groups.py",
-                "Events": "pages/Alumni/6_Events.py",
-                "Contributions": "pages/Alumni/7_Contributions.py",
-                "Settings": "pages/Alumni/8_Settings.py"
-            }
-        
-        else:  # admin
-            menu_options = ["Dashboard", "Student Management", "Alumni Management", "Announcements", 
-                           "Confession Moderation", "Groups Management", "Analytics"]
+        else:
             selected = st.selectbox("Navigation", menu_options)
-            
-            page_map = {
-                "Dashboard": "pages/Admin/1_Dashboard.py",
-                "Student Management": "pages/Admin/2_Student_Management.py",
-                "Alumni Management": "pages/Admin/3_Alumni_Management.py",
-                "Announcements": "pages/Admin/4_Announcements.py",
-                "Confession Moderation": "pages/Admin/5_Confession_Moderation.py",
-                "Groups Management": "pages/Admin/6_Groups_Management.py",
-                "Analytics": "pages/Admin/7_Analytics.py"
-            }
         
         st.markdown("---")
         
         # Quick stats
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
         if st.session_state.user_role == 'student':
-            cursor.execute("SELECT COUNT(*) FROM connections WHERE user_id = ? AND status = 'accepted'", 
-                         (st.session_state.user_id,))
-            friends = cursor.fetchone()[0]
-            
-            cursor.execute("""SELECT COUNT(*) FROM event_registrations er 
-                           JOIN events e ON er.event_id = e.id 
-                           WHERE er.user_id = ? AND e.event_date >= date('now')""", 
-                         (st.session_state.user_id,))
-            events = cursor.fetchone()[0]
-            
-            st.metric("👥 Friends", friends)
-            st.metric("📅 Events", events)
-        
-        conn.close()
+            snapshot = get_dashboard_snapshot(st.session_state.user_id)
+            st.metric("👥 Friends", snapshot['friends'])
+            st.metric("📅 Events", snapshot['upcoming_events'])
         
         st.markdown("---")
         
         if st.button("🚪 Logout", use_container_width=True, type="secondary"):
+            # A pending student export is only reachable from this session
+            if st.session_state.get('student_export'):
+                remove_export_file(st.session_state.student_export['path'])
             for key in list(st.session_state.keys()):
                 del st.session_state[key]
             st.rerun()
     
     # Show selected page
-    if selected in page_map:
-        try:
-            # Dynamically import and show the page
-            module_path = page_map[selected].replace('/', '.').replace('.py', '')
-            module = __import__(module_path, fromlist=['show'])
-            module.show()
-        except Exception as e:
-            st.error(f"Error loading page: {e}")
-            st.info(f"Page: {page_map[selected]}")
-    else:
+    try:
+        page_registry.load(role, selected).show()
+    except PageNotFoundError:
         st.error("Page not found")
+    except Exception as e:
+        st.error(f"Error loading page: {e}")
 
 # Main Application
 def main():
+    setup_logging()
     load_css()
     init_session_state()
     init_db()  # Initialize database
+    start_warmup()  # Background thread, once per process
     
     if not st.session_state.logged_in:
         show_login_page()
@@ -0,0 +1,218 @@
+"""
+Event check-in for volunteers scanning registration codes at the door.
+
+Scans are answered from memory: the first scan for an event loads its
+code -> registration map once, duplicates are caught in memory, and
+accepted scans go onto a write-behind queue. A background thread writes
+the queue in batched transactions at least every FLUSH_INTERVAL seconds,
+so no scan waits on a database write and attendance lands within a
+bounded delay.
+
+The live counter is the persisted events.attended_count (refreshed after
+each flush) plus the scans still waiting in the queue, so showing it
+never touches event_registrations.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+from utils.database import get_db_connection
+
+FLUSH_INTERVAL = 0.5
+MAX_BATCH_SIZE = 200
+
+logger = logging.getLogger(__name__)
+
+
+class CheckInQueue:
+    """Per-process check-in state with a write-behind flush thread"""
+
+    def __init__(self, flush_interval=FLUSH_INTERVAL, max_batch_size=MAX_BATCH_SIZE):
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._codes = {}        # event_id -> {code: registration_id}
+        self._checked_in = {}   # event_id -> {registration ids already attended}
+        self._persisted = {}    # event_id -> attended_count at the last flush
+        self._pending = []      # (event_id, registration_id, scanned_at)
+        self._in_flight = []    # batch currently being written
+        self._thread = None
+
+    def _fetch_event(self, event_id):
+        """Read an event's codes and attendance; called without holding _lock"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT id, checkin_code, attendance_status FROM event_registrations
+            WHERE event_id = ?
+        ''', (event_id,))
+        rows = cursor.fetchall()
+        cursor.execute("SELECT attended_count FROM events WHERE id = ?", (event_id,))
+        event = cursor.fetchone()
+        conn.close()
+
+        codes = {row['checkin_code']: row['id'] for row in rows}
+        checked_in = {row['id'] for row in rows if row['attendance_status'] == 'attended'}
+        return codes, checked_in, event['attended_count'] if event else 0
+
+    def _ensure_loaded(self, event_id):
+        """Load the event once; scans for other events are not blocked meanwhile"""
+        with self._lock:
+            if event_id in self._codes:
+                return
+
+        codes, checked_in, persisted = self._fetch_event(event_id)
+
+        with self._lock:
+            # Another thread may have loaded it first; its state may already have scans
+            if event_id not in self._codes:
+                self._codes[event_id] = codes
+                self._checked_in[event_id] = checked_in
+                self._persisted[event_id] = persisted
+
+    def _lookup_new_registration(self, event_id, code):
+        """Single index seek for codes issued after the event was loaded"""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT id, attendance_status FROM event_registrations
+            WHERE event_id = ? AND checkin_code = ?
+        ''', (event_id, code))
+        row = cursor.fetchone()
+        conn.close()
+        return row
+
+    def scan(self, event_id, code):
+        """
+        Record a scanned code; returns 'checked_in', 'duplicate' or 'unknown'.
+
+        Scanning the same code again is harmless: it is reported as a
+        duplicate and never queued twice.
+        """
+        code = code.strip().upper()
+
+        self._ensure_loaded(event_id)
+
+        with self._lock:
+            registration_id = self._codes[event_id].get(code)
+
+        if registration_id is None:
+            row = self._lookup_new_registration(event_id, code)
+            if not row:
+                return 'unknown'
+            with self._lock:
+                registration_id = self._codes[event_id][code] = row['id']
+                if row['attendance_status'] == 'attended':
+                    self._checked_in[event_id].add(row['id'])
+
+        with self._lock:
+            if registration_id in self._checked_in[event_id]:
+                return 'duplicate'
+            self._checked_in[event_id].add(registration_id)
+            self._pending.append((event_id, registration_id,
+                                  datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")))
+            queued = len(self._pending)
+
+        self._ensure_thread()
+        if queued >= self.max_batch_size:
+            self._wakeup.set()
+
+        return 'checked_in'
+
+    def attended_count(self, event_id):
+        """Live attendance: persisted count plus scans not yet flushed"""
+        self._ensure_loaded(event_id)
+
+        with self._lock:
+            pending = sum(1 for item in self._pending + self._in_flight if item[0] == event_id)
+            return self._persisted[event_id] + pending
+
+    def flush(self):
+        """Write queued scans in one transaction; returns the number written"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                self._in_flight = batch
+
+            if not batch:
+                return 0
+
+            conn = get_db_connection()
+            cursor = conn.cursor()
+
+            try:
+                # The status guard makes replays and scans from other workers no-ops
+                cursor.executemany('''
+                    UPDATE event_registrations
+                    SET attendance_status = 'attended', checked_in_at = ?
+                    WHERE id = ? AND attendance_status IS NOT 'attended'
+                ''', [(scanned_at, registration_id) for _, registration_id, scanned_at in batch])
+
+                event_ids = sorted({event_id for event_id, _, _ in batch})
+                placeholders = ', '.join(['?'] * len(event_ids))
+                cursor.execute(f'''
+                    SELECT id, attended_count FROM events WHERE id IN ({placeholders})
+                ''', tuple(event_ids))
+                counts = {row['id']: row['attended_count'] for row in cursor.fetchall()}
+
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                with self._lock:
+                    self._pending = batch + self._pending
+                    self._in_flight = []
+                raise
+            finally:
+                conn.close()
+
+            with self._lock:
+                self._persisted.update(counts)
+                self._in_flight = []
+
+            return len(batch)
+
+    def forget_event(self, event_id):
+        """Drop the cached codes for an event once check-in closes"""
+        self.flush()
+        with self._lock:
+            self._codes.pop(event_id, None)
+            self._checked_in.pop(event_id, None)
+            self._persisted.pop(event_id, None)
+
+    def _ensure_thread(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="checkin-flush", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Check-in flush failed, will retry")
+                time.sleep(self.flush_interval)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_checkin_queue():
+    """Return the process-wide check-in queue"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = CheckInQueue()
+            atexit.register(_queue.flush)
+        return _queue
@@ -1,17 +1,56 @@
 import sqlite3
 import os
 import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 
 DB_PATH = "data/mes_connect.db"
 
+# Tables whose writes bump a data_versions row of the same name
+VERSIONED_TABLES = (
+    'users', 'students', 'alumni', 'connections', 'messages', 'confessions',
+    'confession_likes', 'events', 'event_registrations', 'event_waitlist',
+    'groups', 'group_members', 'group_messages',
+)
+
+# Check-in code of a registration row: hex id, '-', 8 random hex digits
+CHECKIN_CODE_SQL = "printf('%X-', {row}.id) || upper(hex(randomblob(4)))"
+
+# High-churn bookkeeping columns that no cached query depends on; updates
+# touching only these leave the table version alone
+UNVERSIONED_COLUMNS = {
+    'users': ('last_login',),
+    'group_members': ('last_read_message_id',),
+    'events': ('attended_count',),
+}
+
+QUERY_CACHE_SIZE = 1024
+QUERY_CACHE_TTL = 60
+
+# Longest time (seconds) a worker may serve cached data after another
+# worker process commits a change
+COHERENCE_WINDOW = float(os.environ.get("MES_CONNECT_COHERENCE_WINDOW", "1.0"))
+
+class TrackedConnection(sqlite3.Connection):
+    """Connection whose commits are announced to the in-process version bus"""
+    
+    def commit(self):
+        super().commit()
+        version_bus.mark_dirty()
+
 def get_db_connection():
     """Create and return a database connection"""
     os.makedirs("data", exist_ok=True)
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, factory=TrackedConnection)
     conn.row_factory = sqlite3.Row
     return conn
 
+def local_today():
+    """Today's date on the local clock, which event dates and times are entered in"""
+    return datetime.now().date()
+
 def init_db():
     """Initialize database with all tables"""
     conn = get_db_connection()
@@ -157,6 +196,9 @@ def init_db():
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             is_active BOOLEAN DEFAULT 1,
             cover_image TEXT,
+            registered_count INTEGER NOT NULL DEFAULT 0,
+            waitlist_count INTEGER NOT NULL DEFAULT 0,
+            attended_count INTEGER NOT NULL DEFAULT 0,
             FOREIGN KEY (organizer_id) REFERENCES users (id) ON DELETE CASCADE
         )
     ''')
@@ -172,12 +214,353 @@ def init_db():
             attendance_status TEXT DEFAULT 'registered',
             feedback TEXT,
             rating INTEGER,
+            checkin_code TEXT,
+            checked_in_at TIMESTAMP,
             FOREIGN KEY (event_id) REFERENCES events (id) ON DELETE CASCADE,
             FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
             UNIQUE(event_id, user_id)
         )
     ''')
-    
+
+    # Denormalized registration counts, kept in sync by triggers
+    registrations_added = add_column_if_missing(cursor, 'events', 'registered_count',
+                                                'INTEGER NOT NULL DEFAULT 0')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_event_registrations_insert
+        AFTER INSERT ON event_registrations
+        BEGIN
+            UPDATE events SET registered_count = registered_count + 1 WHERE id = NEW.event_id;
+        END
+    ''')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_event_registrations_delete
+        AFTER DELETE ON event_registrations
+        BEGIN
+            UPDATE events SET registered_count = registered_count - 1 WHERE id = OLD.event_id;
+        END
+    ''')
+
+    if registrations_added:
+        reconcile_event_registered_counts(cursor)
+
+    # Event Waitlist (FIFO by position; positions are dense per event, so a
+    # user's place is their position minus the head's, two index seeks)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS event_waitlist (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            position INTEGER NOT NULL DEFAULT 0,
+            FOREIGN KEY (event_id) REFERENCES events (id) ON DELETE CASCADE,
+            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
+            UNIQUE(event_id, user_id)
+        )
+    ''')
+
+    if add_column_if_missing(cursor, 'event_waitlist', 'position', 'INTEGER NOT NULL DEFAULT 0'):
+        cursor.execute('''
+            UPDATE event_waitlist SET position = (
+                SELECT COUNT(*) FROM event_waitlist w
+                WHERE w.event_id = event_waitlist.event_id AND w.id <= event_waitlist.id
+            )
+        ''')
+
+    cursor.execute("DROP INDEX IF EXISTS idx_event_waitlist_order")
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_event_waitlist_position
+        ON event_waitlist (event_id, position)
+    ''')
+
+    # Leaving from the middle closes the gap behind; promotions take the
+    # head, which leaves nothing to shift
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_event_waitlist_close_gap
+        AFTER DELETE ON event_waitlist
+        WHEN EXISTS (
+            SELECT 1 FROM event_waitlist
+            WHERE event_id = OLD.event_id AND position < OLD.position
+        )
+        BEGIN
+            UPDATE event_waitlist SET position = position - 1
+            WHERE event_id = OLD.event_id AND position > OLD.position;
+        END
+    ''')
+
+    waitlist_added = add_column_if_missing(cursor, 'events', 'waitlist_count',
+                                           'INTEGER NOT NULL DEFAULT 0')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_event_waitlist_insert
+        AFTER INSERT ON event_waitlist
+        BEGIN
+            UPDATE events SET waitlist_count = waitlist_count + 1 WHERE id = NEW.event_id;
+        END
+    ''')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_event_waitlist_delete
+        AFTER DELETE ON event_waitlist
+        BEGIN
+            UPDATE events SET waitlist_count = waitlist_count - 1 WHERE id = OLD.event_id;
+        END
+    ''')
+
+    if waitlist_added:
+        cursor.execute('''
+            UPDATE events SET waitlist_count = (
+                SELECT COUNT(*) FROM event_waitlist w WHERE w.event_id = events.id
+            )
+        ''')
+
+    # Event check-in: a short code per registration and a running attendance count
+    codes_added = add_column_if_missing(cursor, 'event_registrations', 'checkin_code', 'TEXT')
+    add_column_if_missing(cursor, 'event_registrations', 'checked_in_at', 'TIMESTAMP')
+    attended_added = add_column_if_missing(cursor, 'events', 'attended_count',
+                                           'INTEGER NOT NULL DEFAULT 0')
+
+    # Codes are the registration id in hex plus a random suffix: the id makes
+    # them unique (no retry on collision), the suffix makes them unguessable
+    if codes_added:
+        cursor.execute(f'''
+            UPDATE event_registrations SET checkin_code = {CHECKIN_CODE_SQL.format(row='event_registrations')}
+            WHERE checkin_code IS NULL
+        ''')
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_event_registrations_checkin
+        ON event_registrations (event_id, checkin_code)
+    ''')
+
+    # Both triggers are recreated so existing databases get the current definitions
+    cursor.execute("DROP TRIGGER IF EXISTS trg_event_registrations_checkin_code")
+    cursor.execute(f'''
+        CREATE TRIGGER trg_event_registrations_checkin_code
+        AFTER INSERT ON event_registrations
+        WHEN NEW.checkin_code IS NULL
+        BEGIN
+            UPDATE event_registrations SET checkin_code = {CHECKIN_CODE_SQL.format(row='NEW')}
+            WHERE id = NEW.id;
+        END
+    ''')
+
+    # IS NOT, so a NULL status on either side still counts as "not attended"
+    cursor.execute("DROP TRIGGER IF EXISTS trg_event_registrations_attendance")
+    cursor.execute('''
+        CREATE TRIGGER trg_event_registrations_attendance
+        AFTER UPDATE OF attendance_status ON event_registrations
+        WHEN (OLD.attendance_status IS 'attended') IS NOT (NEW.attendance_status IS 'attended')
+        BEGIN
+            UPDATE events
+            SET attended_count = attended_count + (CASE WHEN NEW.attendance_status = 'attended'
+                                                        THEN 1 ELSE -1 END)
+            WHERE id = NEW.event_id;
+        END
+    ''')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_event_registrations_attended_delete
+        AFTER DELETE ON event_registrations
+        WHEN OLD.attendance_status = 'attended'
+        BEGIN
+            UPDATE events SET attended_count = attended_count - 1 WHERE id = OLD.event_id;
+        END
+    ''')
+
+    if attended_added:
+        cursor.execute('''
+            UPDATE events SET attended_count = (
+                SELECT COUNT(*) FROM event_registrations er
+                WHERE er.event_id = events.id AND er.attendance_status = 'attended'
+            )
+        ''')
+
+    # Event Reminders: a due-time index derived from registrations (event start)
+    # and waitlist entries (registration deadline), kept in sync by triggers
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'event_reminders'")
+    reminders_table = cursor.fetchone()
+    reminders_existed = reminders_table is not None
+
+    # Tables from before kind was NOT NULL are dropped; being derived, the
+    # backfill below rebuilds them
+    if reminders_existed and "kind TEXT NOT NULL" not in reminders_table['sql']:
+        cursor.execute("DROP TABLE event_reminders")
+        reminders_existed = False
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS event_reminders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            event_id INTEGER NOT NULL,
+            kind TEXT NOT NULL CHECK(kind IN ('event', 'deadline')),
+            due_at TEXT NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
+            FOREIGN KEY (event_id) REFERENCES events (id) ON DELETE CASCADE,
+            UNIQUE(user_id, event_id, kind)
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_event_reminders_due
+        ON event_reminders (user_id, due_at)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_event_reminders_event
+        ON event_reminders (event_id)
+    ''')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_event_reminders_registration_insert
+        AFTER INSERT ON event_registrations
+        BEGIN
+            INSERT OR REPLACE INTO event_reminders (user_id, event_id, kind, due_at)
+            SELECT NEW.user_id, e.id, 'event', e.event_date || ' ' || e.event_time
+            FROM events e WHERE e.id = NEW.event_id AND e.is_active = 1;
+        END
+    ''')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_event_reminders_registration_delete
+        AFTER DELETE ON event_registrations
+        BEGIN
+            DELETE FROM event_reminders
+            WHERE user_id = OLD.user_id AND event_id = OLD.event_id AND kind = 'event';
+        END
+    ''')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_event_reminders_waitlist_insert
+        AFTER INSERT ON event_waitlist
+        BEGIN
+            INSERT OR REPLACE INTO event_reminders (user_id, event_id, kind, due_at)
+            SELECT NEW.user_id, e.id, 'deadline', e.registration_deadline || ' 23:59:59'
+            FROM events e
+            WHERE e.id = NEW.event_id AND e.is_active = 1
+            AND e.registration_deadline IS NOT NULL;
+        END
+    ''')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_event_reminders_waitlist_delete
+        AFTER DELETE ON event_waitlist
+        BEGIN
+            DELETE FROM event_reminders
+            WHERE user_id = OLD.user_id AND event_id = OLD.event_id AND kind = 'deadline';
+        END
+    ''')
+
+    # Rescheduling or (de)activating an event rebuilds just that event's reminders
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_event_reminders_reschedule
+        AFTER UPDATE OF event_date, event_time, registration_deadline, is_active ON events
+        BEGIN
+            DELETE FROM event_reminders WHERE event_id = NEW.id;
+            INSERT INTO event_reminders (user_id, event_id, kind, due_at)
+            SELECT er.user_id, NEW.id, 'event', NEW.event_date || ' ' || NEW.event_time
+            FROM event_registrations er
+            WHERE er.event_id = NEW.id AND NEW.is_active = 1;
+            INSERT INTO event_reminders (user_id, event_id, kind, due_at)
+            SELECT w.user_id, NEW.id, 'deadline', NEW.registration_deadline || ' 23:59:59'
+            FROM event_waitlist w
+            WHERE w.event_id = NEW.id AND NEW.is_active = 1
+            AND NEW.registration_deadline IS NOT NULL;
+        END
+    ''')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_event_reminders_event_delete
+        AFTER DELETE ON events
+        BEGIN
+            DELETE FROM event_reminders WHERE event_id = OLD.id;
+        END
+    ''')
+
+    if not reminders_existed:
+        cursor.execute('''
+            INSERT OR IGNORE INTO event_reminders (user_id, event_id, kind, due_at)
+            SELECT er.user_id, e.id, 'event', e.event_date || ' ' || e.event_time
+            FROM event_registrations er
+            JOIN events e ON e.id = er.event_id AND e.is_active = 1
+        ''')
+        cursor.execute('''
+            INSERT OR IGNORE INTO event_reminders (user_id, event_id, kind, due_at)
+            SELECT w.user_id, e.id, 'deadline', e.registration_deadline || ' 23:59:59'
+            FROM event_waitlist w
+            JOIN events e ON e.id = w.event_id AND e.is_active = 1
+            WHERE e.registration_deadline IS NOT NULL
+        ''')
+
+    # Event archive: past events and their registrations move here (see
+    # events.archive_past_events), leaving one stats row per event
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS events_archive (
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            description TEXT,
+            organizer_id INTEGER NOT NULL,
+            event_type TEXT,
+            event_date DATE NOT NULL,
+            event_time TIME NOT NULL,
+            end_date DATE,
+            end_time TIME,
+            location TEXT,
+            online_link TEXT,
+            max_participants INTEGER,
+            fee REAL DEFAULT 0,
+            registration_deadline DATE,
+            created_at TIMESTAMP,
+            is_active BOOLEAN,
+            cover_image TEXT,
+            registered_count INTEGER NOT NULL DEFAULT 0,
+            waitlist_count INTEGER NOT NULL DEFAULT 0,
+            attended_count INTEGER NOT NULL DEFAULT 0,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS event_registrations_archive (
+            id INTEGER PRIMARY KEY,
+            event_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            registration_date TIMESTAMP,
+            payment_status TEXT,
+            attendance_status TEXT,
+            feedback TEXT,
+            rating INTEGER,
+            checkin_code TEXT,
+            checked_in_at TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_event_registrations_archive_event
+        ON event_registrations_archive (event_id)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_event_registrations_archive_user
+        ON event_registrations_archive (user_id)
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS event_stats (
+            event_id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            event_type TEXT,
+            organizer_id INTEGER NOT NULL,
+            event_date DATE NOT NULL,
+            registrations INTEGER NOT NULL DEFAULT 0,
+            attended INTEGER NOT NULL DEFAULT 0,
+            rating_count INTEGER NOT NULL DEFAULT 0,
+            avg_rating REAL,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_event_stats_organizer
+        ON event_stats (organizer_id, event_date)
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_date ON events (event_date)")
+
     # Groups
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS groups (
@@ -191,6 +574,8 @@ def init_db():
             cover_image TEXT,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             rules TEXT,
+            member_count INTEGER NOT NULL DEFAULT 0,
+            cohort_value TEXT,
             FOREIGN KEY (creator_id) REFERENCES users (id) ON DELETE CASCADE
         )
     ''')
@@ -204,12 +589,257 @@ def init_db():
             role TEXT DEFAULT 'member' CHECK(role IN ('member', 'admin', 'moderator')),
             joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             is_banned BOOLEAN DEFAULT 0,
+            last_read_message_id INTEGER NOT NULL DEFAULT 0,
             FOREIGN KEY (group_id) REFERENCES groups (id) ON DELETE CASCADE,
             FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
             UNIQUE(group_id, user_id)
         )
     ''')
-    
+
+    # Denormalized member counts (non-banned members), kept in sync by triggers
+    counts_added = add_column_if_missing(cursor, 'groups', 'member_count',
+                                         'INTEGER NOT NULL DEFAULT 0')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_groups_member_count
+        ON groups (member_count, id)
+    ''')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_group_members_insert
+        AFTER INSERT ON group_members
+        WHEN NEW.is_banned = 0
+        BEGIN
+            UPDATE groups SET member_count = member_count + 1 WHERE id = NEW.group_id;
+        END
+    ''')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_group_members_delete
+        AFTER DELETE ON group_members
+        WHEN OLD.is_banned = 0
+        BEGIN
+            UPDATE groups SET member_count = member_count - 1 WHERE id = OLD.group_id;
+        END
+    ''')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_group_members_update
+        AFTER UPDATE OF group_id, is_banned ON group_members
+        WHEN OLD.group_id != NEW.group_id OR OLD.is_banned != NEW.is_banned
+        BEGIN
+            UPDATE groups SET member_count = member_count - (OLD.is_banned = 0)
+            WHERE id = OLD.group_id;
+            UPDATE groups SET member_count = member_count + (NEW.is_banned = 0)
+            WHERE id = NEW.group_id;
+        END
+    ''')
+
+    if counts_added:
+        reconcile_group_member_counts(cursor)
+
+    # Department/batch groups whose membership is synced from students
+    add_column_if_missing(cursor, 'groups', 'cohort_value', 'TEXT')
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_groups_cohort
+        ON groups (group_type, cohort_value) WHERE cohort_value IS NOT NULL
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_students_department ON students (department)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_students_batch ON students (batch)")
+
+    # Indexes for group discovery (keyset pagination and per-user lookups)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_groups_created_at ON groups (created_at, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_groups_name ON groups (name, id)")
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_group_members_user
+        ON group_members (user_id, is_banned)
+    ''')
+
+    # Admin student table (keyset pagination by join date or by name)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_role_created ON users (role, created_at, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_students_name ON students (full_name, user_id)")
+
+    # Data versions, bumped on every change so caches know when to refresh.
+    # Table-level rows are named after the table; entity-level rows use
+    # '<entity>:<id>' names (see the triggers below and VERSIONED_TABLES)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS data_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+    # Calendar feeds only change with the event columns they export
+    cursor.execute("INSERT OR IGNORE INTO data_versions (name) VALUES ('event_calendar')")
+
+    calendar_triggers = {
+        'insert': 'AFTER INSERT ON events',
+        'update': '''AFTER UPDATE OF title, description, event_type, event_date, event_time,
+                     end_date, end_time, location, online_link, is_active ON events''',
+        'delete': 'AFTER DELETE ON events',
+    }
+    for action, timing in calendar_triggers.items():
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_event_calendar_version_{action}
+            {timing}
+            BEGIN
+                UPDATE data_versions SET version = version + 1 WHERE name = 'event_calendar';
+            END
+        ''')
+
+    # Per-user versions ('user:<id>') for the dashboard counters: friends,
+    # registrations, group memberships and received messages
+    user_version_sources = {
+        'connections': ('user_id', ('INSERT', 'UPDATE', 'DELETE')),
+        'event_registrations': ('user_id', ('INSERT', 'DELETE')),
+        'group_members': ('user_id', ('INSERT', 'DELETE')),
+        'messages': ('receiver_id', ('INSERT', 'UPDATE', 'DELETE')),
+    }
+    for table, (column, actions) in user_version_sources.items():
+        for action in actions:
+            row = 'OLD' if action == 'DELETE' else 'NEW'
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_user_version_{action.lower()}
+                AFTER {action} ON {table}
+                BEGIN
+                    INSERT INTO data_versions (name, version) VALUES ('user:' || {row}.{column}, 1)
+                    ON CONFLICT (name) DO UPDATE SET version = version + 1;
+                END
+            ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_messages_receiver_unread
+        ON messages (receiver_id, is_read)
+    ''')
+
+    # Per-user registration lookups (dashboard counts, calendar fingerprints)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_event_registrations_user
+        ON event_registrations (user_id, id)
+    ''')
+
+    # Upcoming events listing (keyset on date, time, id)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_events_upcoming
+        ON events (event_date, event_time, id) WHERE is_active = 1
+    ''')
+
+    # Group Messages (fan-out on read: one row per message, read state lives
+    # in group_members.last_read_message_id)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS group_messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            group_id INTEGER NOT NULL,
+            sender_id INTEGER NOT NULL,
+            message TEXT NOT NULL,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            message_type TEXT DEFAULT 'text',
+            FOREIGN KEY (group_id) REFERENCES groups (id) ON DELETE CASCADE,
+            FOREIGN KEY (sender_id) REFERENCES users (id) ON DELETE CASCADE
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_group_messages_group
+        ON group_messages (group_id, id)
+    ''')
+    add_column_if_missing(cursor, 'group_members', 'last_read_message_id',
+                          'INTEGER NOT NULL DEFAULT 0')
+
+    # New members start reading from the current end of the history
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_group_members_read_cursor
+        AFTER INSERT ON group_members
+        BEGIN
+            UPDATE group_members
+            SET last_read_message_id = (
+                SELECT COALESCE(MAX(id), 0) FROM group_messages WHERE group_id = NEW.group_id
+            )
+            WHERE id = NEW.id;
+        END
+    ''')
+
+    # Graph analytics summaries (filled by analytics.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS graph_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            user_count INTEGER NOT NULL,
+            friendship_count INTEGER NOT NULL,
+            membership_count INTEGER NOT NULL,
+            component_count INTEGER NOT NULL,
+            largest_component INTEGER NOT NULL,
+            duration_ms INTEGER
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS graph_user_stats (
+            user_id INTEGER PRIMARY KEY,
+            component_id INTEGER NOT NULL,
+            degree INTEGER NOT NULL,
+            group_count INTEGER NOT NULL,
+            pagerank REAL NOT NULL,
+            connector_rank INTEGER,
+            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_graph_user_stats_connector
+        ON graph_user_stats (connector_rank) WHERE connector_rank IS NOT NULL
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS graph_components (
+            component_id INTEGER PRIMARY KEY,
+            user_count INTEGER NOT NULL,
+            group_count INTEGER NOT NULL
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS graph_degree_distribution (
+            degree INTEGER PRIMARY KEY,
+            user_count INTEGER NOT NULL
+        )
+    ''')
+
+    # Per-user recommended groups (filled by analytics.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS group_recommendations (
+            user_id INTEGER NOT NULL,
+            rank INTEGER NOT NULL,
+            group_id INTEGER NOT NULL,
+            score REAL NOT NULL,
+            computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, rank),
+            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
+            FOREIGN KEY (group_id) REFERENCES groups (id) ON DELETE CASCADE
+        )
+    ''')
+
+    # Table versions for every tracked table, whichever code path writes to it
+    for table in VERSIONED_TABLES:
+        cursor.execute("INSERT OR IGNORE INTO data_versions (name) VALUES (?)", (table,))
+
+        for action in ('INSERT', 'UPDATE', 'DELETE'):
+            event = action
+            if action == 'UPDATE' and table in UNVERSIONED_COLUMNS:
+                # Listed explicitly so writes to the ignored columns don't fire;
+                # recreated every start so columns added later are included
+                cursor.execute(f"PRAGMA table_info({table})")
+                columns = [row['name'] for row in cursor.fetchall()
+                           if row['name'] not in UNVERSIONED_COLUMNS[table]]
+                event = f"UPDATE OF {', '.join(columns)}"
+                cursor.execute(f"DROP TRIGGER IF EXISTS trg_{table}_version_update")
+
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{action.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE data_versions SET version = version + 1 WHERE name = '{table}';
+                END
+            ''')
+
     # Create admin user
     admin_password = hashlib.sha256("education".encode()).hexdigest()
     
@@ -225,8 +855,321 @@ def init_db():
     
     print("✅ Database initialized successfully!")
 
-def execute_query(query, params=(), fetch_one=False, fetch_all=False):
-    """Execute SQL query safely"""
+def add_column_if_missing(cursor, table, column, definition):
+    """Add a column to an existing table; returns True if it was added"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    if any(row[1] == column for row in cursor.fetchall()):
+        return False
+    
+    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return True
+
+def reconcile_group_member_counts(cursor=None):
+    """Recompute groups.member_count from group_members; returns groups fixed"""
+    conn = None
+    if cursor is None:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+    
+    try:
+        cursor.execute('''
+            UPDATE groups
+            SET member_count = actual.member_count
+            FROM (
+                SELECT g.id, COUNT(gm.id) as member_count
+                FROM groups g
+                LEFT JOIN group_members gm ON gm.group_id = g.id AND gm.is_banned = 0
+                GROUP BY g.id
+            ) AS actual
+            WHERE groups.id = actual.id
+            AND groups.member_count != actual.member_count
+        ''')
+        fixed = cursor.rowcount
+        
+        if conn:
+            conn.commit()
+        return fixed
+    finally:
+        if conn:
+            conn.close()
+
+def reconcile_event_registered_counts(cursor=None):
+    """Recompute events.registered_count from event_registrations; returns events fixed"""
+    conn = None
+    if cursor is None:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+    
+    try:
+        cursor.execute('''
+            UPDATE events
+            SET registered_count = actual.registered_count
+            FROM (
+                SELECT e.id, COUNT(er.id) as registered_count
+                FROM events e
+                LEFT JOIN event_registrations er ON er.event_id = e.id
+                GROUP BY e.id
+            ) AS actual
+            WHERE events.id = actual.id
+            AND events.registered_count != actual.registered_count
+        ''')
+        fixed = cursor.rowcount
+        
+        if conn:
+            conn.commit()
+        return fixed
+    finally:
+        if conn:
+            conn.close()
+
+def bump_data_version(cursor, *names):
+    """Advance version counters by hand, for changes no trigger sees"""
+    cursor.executemany('''
+        INSERT INTO data_versions (name, version) VALUES (?, 1)
+        ON CONFLICT (name) DO UPDATE SET version = version + 1
+    ''', [(name,) for name in names])
+
+class DataVersionBus:
+    """
+    Process-wide reader of data_versions for use in cache keys.
+    
+    Versions are kept in memory and only re-read after PRAGMA data_version
+    reports a commit from another connection, so between writes a lookup
+    never touches the table. The pragma itself is polled at most once per
+    window seconds: commits made through get_db_connection() in this
+    process are seen at once, commits from other worker processes within
+    the window.
+    """
+    
+    def __init__(self, window=COHERENCE_WINDOW):
+        self.window = window
+        self._conn = None
+        self._seen = None
+        self._next_check = 0.0
+        self._versions = {}
+        self._lock = threading.Lock()
+    
+    def mark_dirty(self):
+        """Force the next lookup to re-check for changes"""
+        with self._lock:
+            self._next_check = 0.0
+    
+    def versions(self, *names):
+        """Return the current versions of names as a tuple"""
+        with self._lock:
+            if self._conn is None:
+                os.makedirs("data", exist_ok=True)
+                self._conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+            
+            now = time.monotonic()
+            if now >= self._next_check:
+                self._next_check = now + self.window
+                data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+                if data_version != self._seen:
+                    self._seen = data_version
+                    self._versions.clear()
+            
+            missing = [name for name in names if name not in self._versions]
+            if missing:
+                placeholders = ', '.join(['?'] * len(missing))
+                rows = self._conn.execute(
+                    f"SELECT name, version FROM data_versions WHERE name IN ({placeholders})",
+                    missing).fetchall()
+                self._versions.update(dict.fromkeys(missing, 0))
+                self._versions.update(rows)
+            
+            return tuple(self._versions[name] for name in names)
+    
+    def version(self, name):
+        """Return the current version of one name"""
+        return self.versions(name)[0]
+
+version_bus = DataVersionBus()
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution"""
+    
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+    
+    def do(self, key, fn):
+        """
+        Run fn() unless a call for key is already in flight, in which case
+        wait for it and share its result (or exception). Returns (value,
+        shared) where shared is True for callers that waited.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {'done': threading.Event(), 'value': None, 'error': None}
+        
+        if not leader:
+            call['done'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['value'], True
+        
+        try:
+            call['value'] = fn()
+        except BaseException as e:
+            call['error'] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call['done'].set()
+        
+        return call['value'], False
+
+class VersionedCache:
+    """
+    Thread-safe LRU cache whose entries expire when their data version
+    changes or, if ttl is set, after ttl seconds.
+    
+    Concurrent misses for the same key and version are coalesced: one
+    caller runs the loader and the rest wait for its result.
+    """
+    
+    def __init__(self, max_entries=256, ttl=None, single_flight=True):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.single_flight = single_flight
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        self._stats = {'hits': 0, 'misses': 0, 'stale': 0, 'expired': 0, 'evictions': 0,
+                       'loads': 0, 'coalesced': 0}
+    
+    def get_or_load(self, key, version, loader):
+        """Return the cached value for key at version, calling loader() on a miss"""
+        now = time.monotonic()
+        
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached and cached[0] == version and (cached[2] is None or cached[2] > now):
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return cached[1]
+            
+            self._stats['misses'] += 1
+            if cached:
+                self._stats['stale' if cached[0] != version else 'expired'] += 1
+        
+        if not self.single_flight:
+            return self._load(key, version, loader, now)
+        
+        value, shared = self._flights.do((key, version),
+                                         lambda: self._load(key, version, loader, now))
+        if shared:
+            with self._lock:
+                self._stats['coalesced'] += 1
+        return value
+    
+    def _load(self, key, version, loader, now):
+        value = loader()
+        expires_at = now + self.ttl if self.ttl else None
+        
+        with self._lock:
+            self._stats['loads'] += 1
+            self._entries[key] = (version, value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+        
+        return value
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """Return hit/miss counters, the hit rate and the current size"""
+        with self._lock:
+            stats = dict(self._stats, size=len(self._entries))
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+    
+    def __len__(self):
+        return len(self._entries)
+
+_snapshot_cache = VersionedCache(4096)
+
+def get_dashboard_snapshot(user_id):
+    """
+    Return the user's dashboard counters: friends, upcoming_events, groups
+    and unread_messages.
+    
+    Cached per user and keyed on the user's version (bumped by triggers on
+    their connections, registrations, memberships and messages) and the
+    event calendar version, so a hit runs no query at all. The local date
+    is part of the key, so "upcoming" rolls over at local midnight.
+    """
+    today = local_today().isoformat()
+    version = version_bus.versions(f'user:{user_id}', 'event_calendar') + (today,)
+    
+    def load():
+        conn = get_db_connection()
+        try:
+            cursor = conn.execute('''
+                SELECT
+                    (SELECT COUNT(*) FROM connections
+                     WHERE user_id = ? AND status = 'accepted') as friends,
+                    (SELECT COUNT(*) FROM event_registrations er
+                     JOIN events e ON er.event_id = e.id
+                     WHERE er.user_id = ? AND e.event_date >= ?) as upcoming_events,
+                    (SELECT COUNT(*) FROM group_members WHERE user_id = ?) as groups,
+                    (SELECT COUNT(*) FROM messages
+                     WHERE receiver_id = ? AND is_read = 0) as unread_messages
+            ''', (user_id, user_id, today, user_id, user_id))
+            return dict(cursor.fetchone())
+        finally:
+            conn.close()
+    
+    return _snapshot_cache.get_or_load(user_id, version, load)
+
+# Shared across sessions; SELECTs on tables outside VERSIONED_TABLES are
+# never cached because nothing would tell the cache they changed
+_query_cache = VersionedCache(QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL)
+
+# normalized SQL -> frozenset of the tables it reads (depends only on the SQL text)
+_statement_tables = {}
+
+def _query_tables(query, params=()):
+    """
+    Names of the tables a statement reads from
+    
+    SQLite reports every table it reads to the authorizer while compiling
+    the statement, so comma joins, subqueries, CTEs and views are all
+    covered. EXPLAIN compiles the statement without running it.
+    """
+    tables = _statement_tables.get(query)
+    if tables is not None:
+        return tables
+    
+    read = set()
+    
+    def authorizer(action, arg1, arg2, db_name, trigger):
+        if action == sqlite3.SQLITE_READ and arg1:
+            read.add(arg1.lower())
+        return sqlite3.SQLITE_OK
+    
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        conn.set_authorizer(authorizer)
+        conn.execute(f"EXPLAIN {query}", params).fetchall()
+    finally:
+        conn.close()
+    
+    if len(_statement_tables) >= QUERY_CACHE_SIZE:
+        _statement_tables.clear()
+    tables = _statement_tables[query] = frozenset(read)
+    return tables
+
+def _run_query(query, params, fetch_one, fetch_all):
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -251,6 +1194,43 @@ def execute_query(query, params=(), fetch_one=False, fetch_all=False):
     finally:
         conn.close()
 
+def execute_query(query, params=(), fetch_one=False, fetch_all=False, cache=True):
+    """
+    Execute SQL query safely
+    
+    SELECTs are served from a cache shared by all sessions, keyed on the
+    normalized SQL and params and invalidated when any table they read
+    changes (or after QUERY_CACHE_TTL seconds). Pass cache=False for
+    per-user queries that would only crowd out shared entries.
+    """
+    normalized = ' '.join(query.split())
+    
+    if cache and normalized.upper().startswith('SELECT'):
+        tables = _query_tables(normalized, params)
+        key_params = tuple(sorted(params.items())) if isinstance(params, dict) else tuple(params)
+        
+        if tables and tables.issubset(VERSIONED_TABLES):
+            tables = sorted(tables)
+            result = _query_cache.get_or_load(
+                (normalized, key_params, fetch_all), version_bus.versions(*tables),
+                lambda: _run_query(query, params, fetch_one, fetch_all))
+            # Rows are immutable; copy the list so callers cannot change the cached one
+            return list(result) if isinstance(result, list) else result
+    
+    return _run_query(query, params, fetch_one, fetch_all)
+
+def get_query_cache_stats():
+    """Return hit/miss metrics for the shared query cache"""
+    return _query_cache.stats()
+
+def clear_query_cache():
+    """Drop every cached query result"""
+    _query_cache.clear()
+
+def hash_password(password):
+    """Password hash stored in users.password (shared by sign-up, login and bulk import)"""
+    return hashlib.sha256(password.encode()).hexdigest()
+
 def get_user_by_id(user_id):
     """Get user details by ID"""
     query = '''
@@ -265,7 +1245,7 @@ def get_user_by_id(user_id):
         LEFT JOIN alumni a ON u.id = a.user_id
         WHERE u.id = ?
     '''
-    return execute_query(query, (user_id,), fetch_one=True)
+    return execute_query(query, (user_id,), fetch_one=True, cache=False)
 
 def update_user_profile(user_id, **kwargs):
     """Update user profile information"""
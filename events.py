@@ -0,0 +1,763 @@
+"""
+Event data access shared by the Events page and the dashboard.
+"""
+
+import hashlib
+import io
+import sqlite3
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from utils.database import get_db_connection, local_today, version_bus, VersionedCache
+
+EVENTS_PAGE_SIZE = 20
+PAGE_CACHE_SIZE = 256
+CALENDAR_CACHE_SIZE = 128
+CALENDAR_FETCH_SIZE = 500
+CALENDAR_HISTORY_DAYS = 30
+
+EVENT_TYPES = ('workshop', 'seminar', 'hackathon', 'social', 'career_fair', 'other')
+FOR_YOU_WINDOW_DAYS = 60
+FOR_YOU_CACHED = 20
+TYPE_AFFINITY_WEIGHT = 1.0
+TYPE_SMOOTHING = 3
+ORGANIZER_DEPARTMENT_WEIGHT = 0.5
+FRIENDS_WEIGHT = 0.4
+SOON_WEIGHT = 0.2
+SOON_DAYS = 14
+
+ARCHIVE_AFTER_DAYS = 30
+ARCHIVE_BATCH_SIZE = 500
+
+# Event rows and counts are the same for every viewer; only registration
+# state is per user and is looked up separately for each page
+_page_cache = VersionedCache(PAGE_CACHE_SIZE)
+
+# Generated .ics blobs with their ETags, keyed by feed
+_calendar_cache = VersionedCache(CALENDAR_CACHE_SIZE)
+
+# "For you" candidates are shared; each user's ranking is cached separately
+_candidate_cache = VersionedCache(4)
+_for_you_cache = VersionedCache(1024)
+
+
+def register_for_event(event_id, user_id):
+    """
+    Register a user for an event; returns (success, message).
+
+    Capacity and the registration deadline are checked by the INSERT
+    itself, so concurrent sign-ups can never overbook an event.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute('''
+            INSERT INTO event_registrations (event_id, user_id)
+            SELECT e.id, ?
+            FROM events e
+            WHERE e.id = ?
+            AND e.is_active = 1
+            AND (e.registration_deadline IS NULL OR e.registration_deadline >= date('now', 'localtime'))
+            AND (e.max_participants IS NULL OR e.registered_count < e.max_participants)
+        ''', (user_id, event_id))
+
+        if cursor.rowcount == 1:
+            # A seat opened up for someone who was queueing
+            cursor.execute("DELETE FROM event_waitlist WHERE event_id = ? AND user_id = ?",
+                           (event_id, user_id))
+            conn.commit()
+            return True, "Successfully registered for the event!"
+
+        conn.rollback()
+
+        # Nothing inserted: work out which condition failed
+        cursor.execute('''
+            SELECT is_active, registration_deadline < date('now', 'localtime') as closed,
+                   max_participants IS NOT NULL AND registered_count >= max_participants as full,
+                   EXISTS(SELECT 1 FROM event_registrations
+                          WHERE event_id = events.id AND user_id = ?) as registered
+            FROM events WHERE id = ?
+        ''', (user_id, event_id))
+        event = cursor.fetchone()
+
+        if event and event['registered']:
+            return False, "You are already registered for this event"
+        if not event or not event['is_active']:
+            return False, "This event is no longer available"
+        if event['closed']:
+            return False, "Registration for this event has closed"
+        return False, "This event is full. Join the waitlist to get the next free seat"
+    except sqlite3.IntegrityError:
+        conn.rollback()
+        return False, "You are already registered for this event"
+    except Exception as e:
+        conn.rollback()
+        return False, str(e)
+    finally:
+        conn.close()
+
+
+def _promote_from_waitlist(cursor, event_id):
+    """
+    Move waitlisted users into free seats, oldest first; returns promoted
+    user ids. Nobody is promoted into an event that has been deactivated.
+    """
+    promoted = []
+
+    while True:
+        cursor.execute('''
+            SELECT id, user_id FROM event_waitlist
+            WHERE event_id = ?
+            ORDER BY position
+            LIMIT 1
+        ''', (event_id,))
+        head = cursor.fetchone()
+        if not head:
+            break
+
+        cursor.execute('''
+            INSERT INTO event_registrations (event_id, user_id)
+            SELECT e.id, ?
+            FROM events e
+            WHERE e.id = ?
+            AND e.is_active = 1
+            AND (e.max_participants IS NULL OR e.registered_count < e.max_participants)
+        ''', (head['user_id'], event_id))
+        if cursor.rowcount == 0:
+            break
+
+        cursor.execute("DELETE FROM event_waitlist WHERE id = ?", (head['id'],))
+        promoted.append(head['user_id'])
+
+    return promoted
+
+
+def cancel_registration(event_id, user_id):
+    """
+    Cancel a registration and hand the seat to the waitlist.
+
+    The cancellation and the promotion commit together, so a freed seat
+    is never visible to anyone but the head of the waitlist. Returns
+    (success, promoted user ids).
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("DELETE FROM event_registrations WHERE event_id = ? AND user_id = ?",
+                       (event_id, user_id))
+        if cursor.rowcount == 0:
+            conn.rollback()
+            return False, []
+
+        promoted = _promote_from_waitlist(cursor, event_id)
+        conn.commit()
+        return True, promoted
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def join_waitlist(event_id, user_id):
+    """Queue a user for a full event; returns (success, message)"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute('''
+            INSERT INTO event_waitlist (event_id, user_id, position)
+            SELECT e.id, ?, (
+                SELECT COALESCE(MAX(w.position), 0) + 1
+                FROM event_waitlist w WHERE w.event_id = e.id
+            )
+            FROM events e
+            WHERE e.id = ?
+            AND e.is_active = 1
+            AND (e.registration_deadline IS NULL OR e.registration_deadline >= date('now', 'localtime'))
+            AND e.max_participants IS NOT NULL
+            AND e.registered_count >= e.max_participants
+            AND NOT EXISTS (
+                SELECT 1 FROM event_registrations er
+                WHERE er.event_id = e.id AND er.user_id = ?
+            )
+        ''', (user_id, event_id, user_id))
+
+        if cursor.rowcount == 0:
+            conn.rollback()
+            return False, "This event is not taking waitlist entries right now"
+
+        conn.commit()
+        return True, "You're on the waitlist!"
+    except sqlite3.IntegrityError:
+        conn.rollback()
+        return False, "You are already on the waitlist"
+    finally:
+        conn.close()
+
+
+def leave_waitlist(event_id, user_id):
+    """Remove a user from an event's waitlist"""
+    conn = get_db_connection()
+
+    try:
+        conn.execute("DELETE FROM event_waitlist WHERE event_id = ? AND user_id = ?",
+                     (event_id, user_id))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def get_waitlist_position(event_id, user_id):
+    """Return the user's 1-based waitlist position, or None if not queued"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    # Positions are dense, so this is the user's entry minus the head's
+    cursor.execute('''
+        SELECT w.position - (
+            SELECT MIN(head.position) FROM event_waitlist head
+            WHERE head.event_id = w.event_id
+        ) + 1 as position
+        FROM event_waitlist w
+        WHERE w.event_id = ? AND w.user_id = ?
+    ''', (event_id, user_id))
+    row = cursor.fetchone()
+    conn.close()
+
+    return row['position'] if row else None
+
+
+def _query_upcoming_page(cursor, start_date, end_date, after, page_size):
+    query = '''
+        SELECT e.*,
+               COALESCE(s.full_name, a.full_name, u.username) as organizer_name
+        FROM events e
+        JOIN users u ON e.organizer_id = u.id
+        LEFT JOIN students s ON u.id = s.user_id
+        LEFT JOIN alumni a ON u.id = a.user_id
+        WHERE e.is_active = 1
+        AND e.event_date >= ?
+    '''
+    params = [start_date]
+
+    if end_date:
+        query += " AND e.event_date < ?"
+        params.append(end_date)
+
+    if after:
+        query += " AND (e.event_date, e.event_time, e.id) > (?, ?, ?)"
+        params.extend(after)
+
+    query += " ORDER BY e.event_date, e.event_time, e.id LIMIT ?"
+    params.append(page_size + 1)
+
+    cursor.execute(query, tuple(params))
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def get_viewer_event_state(cursor, user_id, event_ids):
+    """Return ({registered event ids}, {waitlisted event ids}) in one query"""
+    if not event_ids:
+        return set(), set()
+
+    placeholders = ', '.join(['?'] * len(event_ids))
+    cursor.execute(f'''
+        SELECT event_id, 'registered' as state FROM event_registrations
+        WHERE user_id = ? AND event_id IN ({placeholders})
+        UNION ALL
+        SELECT event_id, 'waitlisted' as state FROM event_waitlist
+        WHERE user_id = ? AND event_id IN ({placeholders})
+    ''', (user_id, *event_ids, user_id, *event_ids))
+
+    registered, waitlisted = set(), set()
+    for row in cursor.fetchall():
+        (registered if row['state'] == 'registered' else waitlisted).add(row['event_id'])
+
+    return registered, waitlisted
+
+
+def upcoming_events_page(user_id, window_days=None, after=None, page_size=EVENTS_PAGE_SIZE):
+    """
+    Return one page of upcoming events and the cursor for the next page.
+
+    window_days limits the listing to events in the next N days (None for
+    all upcoming events). Each event carries organizer_name,
+    registered_count, waitlist_count, is_registered and is_waitlisted.
+    """
+    after = tuple(after) if after else None
+    today = local_today()
+    start_date = today.isoformat()
+    end_date = (today + timedelta(days=window_days)).isoformat() if window_days else None
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        key = (start_date, end_date, after, page_size)
+        rows = _page_cache.get_or_load(
+            key, version_bus.version('events'),
+            lambda: _query_upcoming_page(cursor, start_date, end_date, after, page_size))
+
+        page, has_more = rows[:page_size], len(rows) > page_size
+        registered, waitlisted = get_viewer_event_state(
+            cursor, user_id, [event['id'] for event in page])
+    finally:
+        conn.close()
+
+    page = [dict(event, is_registered=event['id'] in registered,
+                 is_waitlisted=event['id'] in waitlisted) for event in page]
+
+    next_cursor = None
+    if has_more:
+        last = page[-1]
+        next_cursor = (last['event_date'], last['event_time'], last['id'])
+
+    return page, next_cursor
+
+
+def get_upcoming_reminders(user_id, limit=5):
+    """
+    Return the user's next due reminders, soonest first.
+
+    Reminders come from the event_reminders due-time index, so this is one
+    range scan on (user_id, due_at) however many events the user has. Each
+    row carries kind ('event' or 'deadline'), due_at and the event details.
+    due_at is the event's local wall-clock time, so it is compared with
+    local time, not UTC.
+    """
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT r.kind, r.due_at, e.id as event_id, e.title, e.event_date,
+               e.event_time, e.location, e.registration_deadline
+        FROM event_reminders r
+        JOIN events e ON e.id = r.event_id
+        WHERE r.user_id = ? AND r.due_at >= ?
+        ORDER BY r.due_at
+        LIMIT ?
+    ''', (user_id, now, limit))
+    reminders = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+
+    return reminders
+
+
+CALENDAR_COLUMNS = '''
+    e.id, e.title, e.description, e.event_type, e.event_date, e.event_time,
+    e.end_date, e.end_time, e.location, e.online_link, e.created_at
+'''
+
+
+def _ics_escape(text):
+    return (str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _ics_line(name, value):
+    """Serialise one content line, folded at 75 octets as RFC 5545 requires"""
+    data = f"{name}:{value}".encode('utf-8')
+    chunks = []
+    while len(data) > 75:
+        cut = 75 if not chunks else 74
+        # Never split a multi-byte character
+        while (data[cut] & 0xC0) == 0x80:
+            cut -= 1
+        chunks.append(data[:cut])
+        data = data[cut:]
+    chunks.append(data)
+    return b'\r\n '.join(chunks) + b'\r\n'
+
+
+def _ics_datetime(date_value, time_value):
+    time_digits = ''.join(ch for ch in str(time_value or '') if ch.isdigit())
+    return str(date_value).replace('-', '') + 'T' + time_digits.ljust(6, '0')[:6]
+
+
+def _ics_event(event):
+    created_at = str(event['created_at'])
+    lines = [
+        _ics_line('BEGIN', 'VEVENT'),
+        _ics_line('UID', f"event-{event['id']}@mesconnect"),
+        _ics_line('DTSTAMP', _ics_datetime(created_at[:10], created_at[11:]) + 'Z'),
+        _ics_line('DTSTART', _ics_datetime(event['event_date'], event['event_time'])),
+    ]
+    if event['end_date'] or event['end_time']:
+        lines.append(_ics_line('DTEND', _ics_datetime(event['end_date'] or event['event_date'],
+                                                      event['end_time'] or event['event_time'])))
+    lines.append(_ics_line('SUMMARY', _ics_escape(event['title'])))
+    if event['description']:
+        lines.append(_ics_line('DESCRIPTION', _ics_escape(event['description'])))
+    if event['location'] or event['online_link']:
+        lines.append(_ics_line('LOCATION', _ics_escape(event['location'] or event['online_link'])))
+    if event['online_link']:
+        lines.append(_ics_line('URL', event['online_link']))
+    lines.append(_ics_line('CATEGORIES', _ics_escape(event['event_type'] or 'other')))
+    lines.append(_ics_line('END', 'VEVENT'))
+    return b''.join(lines)
+
+
+def _build_calendar(cursor, name, query, params):
+    """Stream event rows into an .ics blob; returns (etag, blob)"""
+    buffer = io.BytesIO()
+    digest = hashlib.sha256()
+
+    def write(chunk):
+        buffer.write(chunk)
+        digest.update(chunk)
+
+    write(_ics_line('BEGIN', 'VCALENDAR'))
+    write(_ics_line('VERSION', '2.0'))
+    write(_ics_line('PRODID', '-//MES Connect//Events//EN'))
+    write(_ics_line('CALSCALE', 'GREGORIAN'))
+    write(_ics_line('X-WR-CALNAME', _ics_escape(name)))
+
+    cursor.execute(query, params)
+    while True:
+        rows = cursor.fetchmany(CALENDAR_FETCH_SIZE)
+        if not rows:
+            break
+        for row in rows:
+            write(_ics_event(row))
+
+    write(_ics_line('END', 'VCALENDAR'))
+    return f'"{digest.hexdigest()[:32]}"', buffer.getvalue()
+
+
+def _serve_calendar(key, version, build, if_none_match):
+    etag, blob = _calendar_cache.get_or_load(key, version, build)
+    if if_none_match and if_none_match == etag:
+        return etag, None
+    return etag, blob
+
+
+def export_user_calendar(user_id, if_none_match=None):
+    """
+    Return (etag, ics bytes) for the events a user is registered for.
+
+    The blob is only rebuilt when an exported event column or the user's
+    registrations change; otherwise the cached bytes are served. If
+    if_none_match equals the current ETag the bytes are None, meaning the
+    caller's copy is still current.
+    """
+    start_date = (local_today() - timedelta(days=CALENDAR_HISTORY_DAYS)).isoformat()
+    query = f'''
+        SELECT {CALENDAR_COLUMNS}
+        FROM event_registrations er
+        JOIN events e ON e.id = er.event_id
+        WHERE er.user_id = ? AND e.is_active = 1 AND e.event_date >= ?
+        ORDER BY e.event_date, e.event_time, e.id
+    '''
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        # Registration ids only grow, so (count, max id) changes whenever the set does
+        cursor.execute("SELECT COUNT(*), MAX(id) FROM event_registrations WHERE user_id = ?",
+                       (user_id,))
+        fingerprint = tuple(cursor.fetchone())
+        version = (version_bus.version('event_calendar'), fingerprint, start_date)
+
+        return _serve_calendar(
+            ('user', user_id), version,
+            lambda: _build_calendar(cursor, "My MES Connect Events", query, (user_id, start_date)),
+            if_none_match)
+    finally:
+        conn.close()
+
+
+def export_event_type_calendar(event_type=None, if_none_match=None):
+    """Return (etag, ics bytes) for active events of one type (None for all types)"""
+    start_date = (local_today() - timedelta(days=CALENDAR_HISTORY_DAYS)).isoformat()
+
+    query = f"SELECT {CALENDAR_COLUMNS} FROM events e WHERE e.is_active = 1 AND e.event_date >= ?"
+    params = [start_date]
+    if event_type:
+        query += " AND e.event_type = ?"
+        params.append(event_type)
+    query += " ORDER BY e.event_date, e.event_time, e.id"
+
+    name = "MES Connect Events"
+    if event_type:
+        name = f"MES Connect {event_type.replace('_', ' ').title()} Events"
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        version = (version_bus.version('event_calendar'), start_date)
+        return _serve_calendar(
+            ('type', event_type), version,
+            lambda: _build_calendar(cursor, name, query, tuple(params)),
+            if_none_match)
+    finally:
+        conn.close()
+
+
+def _load_for_you_candidates(cursor, start_date, end_date):
+    """Column arrays describing every active event in the window, sorted by id"""
+    cursor.execute('''
+        SELECT e.id, e.event_type, e.event_date, e.organizer_id,
+               s.department as organizer_department
+        FROM events e
+        LEFT JOIN students s ON s.user_id = e.organizer_id
+        WHERE e.is_active = 1 AND e.event_date >= ? AND e.event_date < ?
+        ORDER BY e.id
+    ''', (start_date, end_date))
+    rows = cursor.fetchall()
+
+    today = date.fromisoformat(start_date)
+    type_codes = {event_type: code for code, event_type in enumerate(EVENT_TYPES)}
+
+    return {
+        'id': np.array([row['id'] for row in rows], dtype=np.int64),
+        'type': np.array([type_codes.get(row['event_type'], len(EVENT_TYPES) - 1)
+                          for row in rows], dtype=np.int64),
+        'organizer': np.array([row['organizer_id'] for row in rows], dtype=np.int64),
+        'department': np.array([row['organizer_department'] or '' for row in rows], dtype=object),
+        'days': np.array([(date.fromisoformat(str(row['event_date'])[:10]) - today).days
+                          for row in rows], dtype=np.float64),
+    }
+
+
+def _rank_for_user(cursor, user_id, candidates):
+    """Score all candidates for one user at once; returns [(event_id, score, friends)]"""
+    ids = candidates['id']
+    if not len(ids):
+        return []
+
+    # Event type affinity: smoothed share of the user's past registrations
+    cursor.execute('''
+        SELECT event_type, COUNT(*) as registrations
+        FROM (
+            SELECT e.event_type FROM event_registrations er
+            JOIN events e ON e.id = er.event_id
+            WHERE er.user_id = ?
+            UNION ALL
+            SELECT st.event_type FROM event_registrations_archive ra
+            JOIN event_stats st ON st.event_id = ra.event_id
+            WHERE ra.user_id = ?
+        )
+        GROUP BY event_type
+    ''', (user_id, user_id))
+    type_counts = np.zeros(len(EVENT_TYPES))
+    for row in cursor.fetchall():
+        if row['event_type'] in EVENT_TYPES:
+            type_counts[EVENT_TYPES.index(row['event_type'])] = row['registrations']
+    type_share = ((type_counts + TYPE_SMOOTHING / len(EVENT_TYPES))
+                  / (type_counts.sum() + TYPE_SMOOTHING))
+
+    cursor.execute("SELECT department FROM students WHERE user_id = ?", (user_id,))
+    student = cursor.fetchone()
+    department = student['department'] if student and student['department'] else None
+
+    cursor.execute('''
+        SELECT er.event_id, COUNT(*) as friends
+        FROM connections c
+        JOIN event_registrations er ON er.user_id = c.connected_user_id
+        WHERE c.user_id = ? AND c.status = 'accepted'
+        GROUP BY er.event_id
+    ''', (user_id,))
+    friend_rows = np.array([(row['event_id'], row['friends']) for row in cursor.fetchall()],
+                           dtype=np.int64).reshape(-1, 2)
+    friends = np.zeros(len(ids), dtype=np.int64)
+    position = np.searchsorted(ids, friend_rows[:, 0])
+    found = position < len(ids)
+    found[found] = ids[position[found]] == friend_rows[found, 0]
+    friends[position[found]] = friend_rows[found, 1]
+
+    cursor.execute("SELECT event_id FROM event_registrations WHERE user_id = ?", (user_id,))
+    registered = np.isin(ids, [row['event_id'] for row in cursor.fetchall()])
+
+    scores = (TYPE_AFFINITY_WEIGHT * type_share[candidates['type']]
+              + FRIENDS_WEIGHT * np.log1p(friends)
+              + SOON_WEIGHT * np.exp(-candidates['days'] / SOON_DAYS))
+    if department:
+        scores += ORGANIZER_DEPARTMENT_WEIGHT * (candidates['department'] == department)
+
+    eligible = np.flatnonzero(~registered & (candidates['organizer'] != user_id))
+    best = eligible[np.argsort(-scores[eligible], kind='stable')[:FOR_YOU_CACHED]]
+
+    return list(zip(ids[best].tolist(), scores[best].tolist(), friends[best].tolist()))
+
+
+def recommended_events(user_id, limit=5):
+    """
+    Return upcoming events ranked for the user, best first.
+
+    Scores combine event type affinity from the user's past registrations,
+    a department match with the organizer, friends already registered and
+    how soon the event is. Rankings are cached per user and recomputed when
+    the events change or the user or their friends register. Each event
+    carries organizer_name, score, friends_going and is_waitlisted.
+    """
+    today = local_today()
+    start_date = today.isoformat()
+    end_date = (today + timedelta(days=FOR_YOU_WINDOW_DAYS)).isoformat()
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        calendar_version = version_bus.version('event_calendar')
+        candidates = _candidate_cache.get_or_load(
+            start_date, calendar_version,
+            lambda: _load_for_you_candidates(cursor, start_date, end_date))
+
+        # Registration ids only grow, so (count, max id) moves with every change
+        cursor.execute('''
+            SELECT (SELECT COUNT(*) FROM event_registrations WHERE user_id = ?),
+                   (SELECT MAX(id) FROM event_registrations WHERE user_id = ?),
+                   (SELECT COUNT(*) FROM connections c
+                    JOIN event_registrations er ON er.user_id = c.connected_user_id
+                    WHERE c.user_id = ? AND c.status = 'accepted'),
+                   (SELECT MAX(er.id) FROM connections c
+                    JOIN event_registrations er ON er.user_id = c.connected_user_id
+                    WHERE c.user_id = ? AND c.status = 'accepted')
+        ''', (user_id, user_id, user_id, user_id))
+        version = (calendar_version, start_date, tuple(cursor.fetchone()))
+
+        ranked = _for_you_cache.get_or_load(
+            user_id, version, lambda: _rank_for_user(cursor, user_id, candidates))[:limit]
+        if not ranked:
+            return []
+
+        placeholders = ', '.join(['?'] * len(ranked))
+        cursor.execute(f'''
+            SELECT e.*,
+                   COALESCE(s.full_name, a.full_name, u.username) as organizer_name
+            FROM events e
+            JOIN users u ON e.organizer_id = u.id
+            LEFT JOIN students s ON u.id = s.user_id
+            LEFT JOIN alumni a ON u.id = a.user_id
+            WHERE e.id IN ({placeholders})
+        ''', tuple(event_id for event_id, _, _ in ranked))
+        rows = {row['id']: dict(row) for row in cursor.fetchall()}
+
+        _, waitlisted = get_viewer_event_state(cursor, user_id, list(rows))
+    finally:
+        conn.close()
+
+    return [dict(rows[event_id], score=score, friends_going=friends,
+                 is_registered=False, is_waitlisted=event_id in waitlisted)
+            for event_id, score, friends in ranked if event_id in rows]
+
+
+def _shared_columns(cursor, table, archive_table):
+    """Columns of table that also exist in its archive table, in table order"""
+    cursor.execute(f"PRAGMA table_info({archive_table})")
+    archived = {row[1] for row in cursor.fetchall()}
+    cursor.execute(f"PRAGMA table_info({table})")
+    return ', '.join(row[1] for row in cursor.fetchall() if row[1] in archived)
+
+
+def archive_past_events(older_than_days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Move events that ended more than older_than_days ago into the archive.
+
+    Each batch writes a stats row per event (registrations, attendance,
+    ratings), copies the event and its registrations to the archive
+    tables and deletes them from the live ones in a single transaction,
+    so the hot tables only hold current events. Returns a summary dict.
+    """
+    started = time.perf_counter()
+    cutoff = (local_today() - timedelta(days=older_than_days)).isoformat()
+    summary = {'events': 0, 'registrations': 0}
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        event_columns = _shared_columns(cursor, 'events', 'events_archive')
+        registration_columns = _shared_columns(cursor, 'event_registrations',
+                                               'event_registrations_archive')
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS archive_batch (id INTEGER PRIMARY KEY)")
+
+        while True:
+            cursor.execute('''
+                SELECT id FROM events
+                WHERE event_date < ? AND (end_date IS NULL OR end_date < ?)
+                ORDER BY event_date
+                LIMIT ?
+            ''', (cutoff, cutoff, batch_size))
+            event_ids = [(row['id'],) for row in cursor.fetchall()]
+            if not event_ids:
+                break
+
+            cursor.execute("DELETE FROM archive_batch")
+            cursor.executemany("INSERT INTO archive_batch (id) VALUES (?)", event_ids)
+
+            cursor.execute('''
+                INSERT OR REPLACE INTO event_stats (event_id, title, event_type, organizer_id,
+                                                    event_date, registrations, attended,
+                                                    rating_count, avg_rating)
+                SELECT e.id, e.title, e.event_type, e.organizer_id, e.event_date,
+                       COUNT(er.id),
+                       COALESCE(SUM(er.attendance_status = 'attended'), 0),
+                       COUNT(er.rating),
+                       AVG(er.rating)
+                FROM events e
+                JOIN archive_batch b ON b.id = e.id
+                LEFT JOIN event_registrations er ON er.event_id = e.id
+                GROUP BY e.id
+            ''')
+
+            cursor.execute(f'''
+                INSERT OR REPLACE INTO event_registrations_archive ({registration_columns})
+                SELECT {registration_columns} FROM event_registrations
+                WHERE event_id IN (SELECT id FROM archive_batch)
+            ''')
+            summary['registrations'] += cursor.rowcount
+            cursor.execute(f'''
+                INSERT OR REPLACE INTO events_archive ({event_columns})
+                SELECT {event_columns} FROM events
+                WHERE id IN (SELECT id FROM archive_batch)
+            ''')
+
+            # Events go first so the per-registration count triggers find nothing to update
+            cursor.execute("DELETE FROM events WHERE id IN (SELECT id FROM archive_batch)")
+            summary['events'] += cursor.rowcount
+            cursor.execute('''
+                DELETE FROM event_registrations WHERE event_id IN (SELECT id FROM archive_batch)
+            ''')
+            cursor.execute('''
+                DELETE FROM event_waitlist WHERE event_id IN (SELECT id FROM archive_batch)
+            ''')
+
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    summary['duration_ms'] = int((time.perf_counter() - started) * 1000)
+    return summary
+
+
+def get_past_event_stats(organizer_id, limit=20):
+    """Return stats rows for an organizer's archived events, newest first"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT * FROM event_stats
+        WHERE organizer_id = ?
+        ORDER BY event_date DESC
+        LIMIT ?
+    ''', (organizer_id, limit))
+    stats = cursor.fetchall()
+    conn.close()
+    return stats
+
+
+if __name__ == "__main__":
+    result = archive_past_events()
+    print(f"✅ Archived {result['events']} events and {result['registrations']} "
+          f"registrations ({result['duration_ms']} ms)")
@@ -0,0 +1,391 @@
+"""
+Group data access shared by the Groups pages and the dashboard.
+"""
+
+from utils.database import get_db_connection, version_bus, VersionedCache
+
+DISCOVER_PAGE_SIZE = 20
+PAGE_CACHE_SIZE = 256
+
+# sort key -> (ORDER BY, keyset predicate, cursor columns)
+DISCOVER_SORTS = {
+    'member_count': ('g.member_count DESC, g.id DESC', '(g.member_count, g.id) < (?, ?)',
+                     ('member_count', 'id')),
+    'created_at': ('g.created_at DESC, g.id DESC', '(g.created_at, g.id) < (?, ?)',
+                   ('created_at', 'id')),
+    'name': ('g.name ASC, g.id ASC', '(g.name, g.id) > (?, ?)',
+             ('name', 'id')),
+}
+
+# Discover pages are identical for every viewer without bans, so they are
+# shared across sessions and dropped whenever the groups version moves on
+_page_cache = VersionedCache(PAGE_CACHE_SIZE)
+
+
+def _query_discover_page(cursor, group_type, is_public, sort, after, page_size,
+                         banned_user_id=None):
+    order_by, keyset, _ = DISCOVER_SORTS[sort]
+
+    query = '''
+        SELECT
+            g.*,
+            COALESCE(s.full_name, a.full_name, u.username) as creator_name
+        FROM groups g
+        JOIN users u ON g.creator_id = u.id
+        LEFT JOIN students s ON u.id = s.user_id
+        LEFT JOIN alumni a ON u.id = a.user_id
+    '''
+    params = []
+
+    if banned_user_id is not None:
+        query += '''
+        LEFT JOIN group_members banned
+            ON banned.group_id = g.id AND banned.user_id = ? AND banned.is_banned = 1
+        '''
+        params.append(banned_user_id)
+
+    query += " WHERE 1 = 1"
+
+    if banned_user_id is not None:
+        query += " AND banned.id IS NULL"
+
+    if group_type:
+        query += " AND g.group_type = ?"
+        params.append(group_type)
+
+    if is_public is not None:
+        query += " AND g.is_public = ?"
+        params.append(1 if is_public else 0)
+
+    if after:
+        query += f" AND {keyset}"
+        params.extend(after)
+
+    query += f" ORDER BY {order_by} LIMIT ?"
+    params.append(page_size + 1)
+
+    cursor.execute(query, tuple(params))
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def discover_groups_page(user_id, group_type=None, is_public=None, sort='member_count',
+                         after=None, page_size=DISCOVER_PAGE_SIZE):
+    """
+    Return one page of discoverable groups and the cursor for the next page.
+
+    after is the cursor returned by the previous call (None for the first
+    page). Each row carries creator_name, member_count and is_member.
+    """
+    after = tuple(after) if after else None
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("SELECT 1 FROM group_members WHERE user_id = ? AND is_banned = 1 LIMIT 1",
+                       (user_id,))
+        has_bans = cursor.fetchone() is not None
+
+        if has_bans:
+            rows = _query_discover_page(cursor, group_type, is_public, sort, after,
+                                        page_size, banned_user_id=user_id)
+        else:
+            key = (group_type, is_public, sort, after, page_size)
+            rows = _page_cache.get_or_load(
+                key, version_bus.version('groups'),
+                lambda: _query_discover_page(cursor, group_type, is_public, sort,
+                                             after, page_size))
+
+        page, has_more = rows[:page_size], len(rows) > page_size
+
+        # One membership lookup for the whole page
+        member_of = set()
+        if page:
+            placeholders = ', '.join(['?'] * len(page))
+            cursor.execute(f'''
+                SELECT group_id FROM group_members
+                WHERE user_id = ? AND group_id IN ({placeholders})
+            ''', (user_id, *[group['id'] for group in page]))
+            member_of = {row['group_id'] for row in cursor.fetchall()}
+    finally:
+        conn.close()
+
+    page = [dict(group, is_member=group['id'] in member_of) for group in page]
+
+    next_cursor = None
+    if has_more:
+        columns = DISCOVER_SORTS[sort][2]
+        next_cursor = tuple(page[-1][column] for column in columns)
+
+    return page, next_cursor
+
+
+def join_group(group_id, user_id):
+    """
+    Join a public, non-cohort group; returns False if it cannot be joined.
+
+    Users with any existing membership row (including a ban) are refused.
+    """
+    conn = get_db_connection()
+
+    try:
+        cursor = conn.execute('''
+            INSERT INTO group_members (group_id, user_id)
+            SELECT g.id, ?
+            FROM groups g
+            WHERE g.id = ? AND g.is_public = 1 AND g.cohort_value IS NULL
+            AND NOT EXISTS (
+                SELECT 1 FROM group_members gm
+                WHERE gm.group_id = g.id AND gm.user_id = ?
+            )
+        ''', (user_id, group_id, user_id))
+        conn.commit()
+        return cursor.rowcount == 1
+    finally:
+        conn.close()
+
+
+def send_group_message(group_id, sender_id, message):
+    """Post a message to a group; returns the new message id or None if not allowed"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        # A single row per message, whatever the group size
+        cursor.execute('''
+            INSERT INTO group_messages (group_id, sender_id, message)
+            SELECT ?, ?, ?
+            WHERE EXISTS (
+                SELECT 1 FROM group_members
+                WHERE group_id = ? AND user_id = ? AND is_banned = 0
+            )
+        ''', (group_id, sender_id, message, group_id, sender_id))
+
+        if cursor.rowcount == 0:
+            conn.rollback()
+            return None
+
+        message_id = cursor.lastrowid
+        cursor.execute('''
+            UPDATE group_members SET last_read_message_id = ?
+            WHERE group_id = ? AND user_id = ?
+        ''', (message_id, group_id, sender_id))
+
+        conn.commit()
+        return message_id
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def get_group_messages(group_id, before_id=None, limit=50):
+    """
+    Return up to limit messages older than before_id, oldest first.
+
+    Each message carries sender_name; names are resolved with one query
+    per page rather than a join per message.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        query = "SELECT * FROM group_messages WHERE group_id = ?"
+        params = [group_id]
+
+        if before_id:
+            query += " AND id < ?"
+            params.append(before_id)
+
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+
+        cursor.execute(query, tuple(params))
+        messages = [dict(row) for row in reversed(cursor.fetchall())]
+
+        sender_ids = sorted({msg['sender_id'] for msg in messages})
+        names = {}
+        if sender_ids:
+            placeholders = ', '.join(['?'] * len(sender_ids))
+            cursor.execute(f'''
+                SELECT u.id, COALESCE(s.full_name, a.full_name, u.username) as display_name
+                FROM users u
+                LEFT JOIN students s ON u.id = s.user_id
+                LEFT JOIN alumni a ON u.id = a.user_id
+                WHERE u.id IN ({placeholders})
+            ''', tuple(sender_ids))
+            names = {row['id']: row['display_name'] for row in cursor.fetchall()}
+    finally:
+        conn.close()
+
+    for msg in messages:
+        msg['sender_name'] = names.get(msg['sender_id'], 'Unknown')
+
+    return messages
+
+
+def mark_group_read(group_id, user_id, message_id):
+    """Move the member's read cursor forward to message_id"""
+    conn = get_db_connection()
+
+    try:
+        conn.execute('''
+            UPDATE group_members SET last_read_message_id = ?
+            WHERE group_id = ? AND user_id = ? AND last_read_message_id < ?
+        ''', (message_id, group_id, user_id, message_id))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def get_group_unread_counts(user_id):
+    """Return {group_id: unread messages} for the groups the user belongs to"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    # Each count is a range scan on idx_group_messages_group past the cursor
+    cursor.execute('''
+        SELECT gm.group_id,
+               (SELECT COUNT(*) FROM group_messages m
+                WHERE m.group_id = gm.group_id AND m.id > gm.last_read_message_id) as unread
+        FROM group_members gm
+        WHERE gm.user_id = ? AND gm.is_banned = 0
+    ''', (user_id,))
+
+    counts = {row['group_id']: row['unread'] for row in cursor.fetchall()}
+    conn.close()
+
+    return counts
+
+
+def get_recommended_groups(user_id, limit=3):
+    """
+    Return the user's top recommended groups from the nightly batch.
+
+    Falls back to public study groups the user is not in when no
+    recommendations have been computed for them yet. Cohort groups are
+    never recommended: their membership follows the students table.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    # Skip groups joined since the batch ran
+    cursor.execute('''
+        SELECT g.*, r.score
+        FROM group_recommendations r
+        JOIN groups g ON g.id = r.group_id
+        WHERE r.user_id = ?
+        AND g.is_public = 1 AND g.cohort_value IS NULL
+        AND NOT EXISTS (
+            SELECT 1 FROM group_members gm
+            WHERE gm.group_id = r.group_id AND gm.user_id = r.user_id
+        )
+        ORDER BY r.rank
+        LIMIT ?
+    ''', (user_id, limit))
+    groups = cursor.fetchall()
+
+    if not groups:
+        cursor.execute('''
+            SELECT g.*
+            FROM groups g
+            WHERE g.group_type = 'study'
+            AND g.is_public = 1
+            AND g.cohort_value IS NULL
+            AND NOT EXISTS (
+                SELECT 1 FROM group_members gm
+                WHERE gm.group_id = g.id AND gm.user_id = ?
+            )
+            ORDER BY g.member_count DESC, g.id DESC
+            LIMIT ?
+        ''', (user_id, limit))
+        groups = cursor.fetchall()
+
+    conn.close()
+    return groups
+
+
+# group_type -> students column the cohort is derived from
+COHORT_COLUMNS = {
+    'department': 'department',
+    'batch': 'batch',
+}
+
+
+def sync_cohort_groups(creator_id=None):
+    """
+    Reconcile auto-managed department and batch groups with the students table.
+
+    Creates missing cohort groups, then adds and removes members with one
+    set-based statement each, all in a single transaction. Manually
+    assigned admins and moderators are left alone. Returns a summary dict.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    summary = {'groups_created': 0, 'members_added': 0, 'members_removed': 0}
+
+    try:
+        if creator_id is None:
+            cursor.execute("SELECT id FROM users WHERE role = 'admin' ORDER BY id LIMIT 1")
+            creator_id = cursor.fetchone()[0]
+
+        for group_type, column in COHORT_COLUMNS.items():
+            cursor.execute(f'''
+                INSERT INTO groups (name, description, creator_id, group_type,
+                                    is_public, cohort_value)
+                SELECT DISTINCT s.{column} || ' {group_type.title()}',
+                       'All students of ' || s.{column}, ?, ?, 1, s.{column}
+                FROM students s
+                WHERE s.{column} IS NOT NULL AND s.{column} != ''
+                AND NOT EXISTS (
+                    SELECT 1 FROM groups g
+                    WHERE g.group_type = ? AND g.cohort_value = s.{column}
+                )
+            ''', (creator_id, group_type, group_type))
+            summary['groups_created'] += cursor.rowcount
+
+            cursor.execute(f'''
+                INSERT INTO group_members (group_id, user_id)
+                SELECT g.id, s.user_id
+                FROM students s
+                JOIN users u ON u.id = s.user_id AND u.is_active = 1
+                JOIN groups g ON g.group_type = ? AND g.cohort_value = s.{column}
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM group_members gm
+                    WHERE gm.group_id = g.id AND gm.user_id = s.user_id
+                )
+            ''', (group_type,))
+            summary['members_added'] += cursor.rowcount
+
+            cursor.execute(f'''
+                DELETE FROM group_members
+                WHERE role = 'member'
+                AND group_id IN (
+                    SELECT id FROM groups
+                    WHERE group_type = ? AND cohort_value IS NOT NULL
+                )
+                AND NOT EXISTS (
+                    SELECT 1 FROM students s
+                    JOIN users u ON u.id = s.user_id AND u.is_active = 1
+                    JOIN groups g ON g.id = group_members.group_id
+                    WHERE s.user_id = group_members.user_id
+                    AND s.{column} = g.cohort_value
+                )
+            ''', (group_type,))
+            summary['members_removed'] += cursor.rowcount
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    return summary
+
+
+if __name__ == "__main__":
+    result = sync_cohort_groups()
+    print(f"✅ Cohort groups synced: {result['groups_created']} created, "
+          f"{result['members_added']} members added, "
+          f"{result['members_removed']} removed")
@@ -0,0 +1,103 @@
+"""
+Import-time budget for the student-facing entry points.
+
+Each target is imported in a fresh interpreter under `python -X importtime`.
+Streamlit is imported first and left out of the measurement, since every
+worker pays for it anyway; what is left is the cost of our own modules.
+The check fails when a target takes longer than the budget or pulls in an
+admin-only library (pandas, plotly, PIL) at import time.
+
+Run with:  python import_budget.py [module ...]
+Exits with status 1 when the budget is exceeded, 2 when a target fails to import.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+IMPORT_BUDGET_MS = float(os.environ.get("MES_CONNECT_IMPORT_BUDGET_MS", "800"))
+HEAVY_MODULES = ("pandas", "plotly", "PIL")
+MARKER = "-- import budget target --"
+
+PROBE = f'''
+import sys
+try:
+    import streamlit
+except ImportError:
+    pass
+sys.stderr.write({MARKER!r} + "\\n")
+import importlib
+importlib.import_module(sys.argv[1])
+'''
+
+
+def default_targets():
+    """app plus every student page module on disk"""
+    pages = sorted(Path("pages/Student").glob("*.py"))
+    return ["app"] + [".".join(path.with_suffix("").parts) for path in pages]
+
+
+def profile_import(target):
+    """
+    Import target in a fresh interpreter; returns a dict with total_ms,
+    heavy (admin-only packages it imported), slowest [(module, self ms)]
+    and error (stderr tail when the import failed, else None)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE, target],
+        capture_output=True, text=True
+    )
+    lines = result.stderr.splitlines()
+    if MARKER in lines:
+        lines = lines[lines.index(MARKER) + 1:]
+
+    total_us = 0
+    modules = []
+    for line in lines:
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        # Top-level imports have no indentation; their cumulative times add up
+        if name[1:2] != " ":
+            total_us += int(cumulative_us)
+        modules.append((name.strip(), int(self_us)))
+
+    heavy = sorted({name.split(".")[0] for name, _ in modules
+                    if name.split(".")[0] in HEAVY_MODULES})
+    slowest = sorted(modules, key=lambda m: m[1], reverse=True)[:8]
+
+    return {
+        'total_ms': round(total_us / 1000, 1),
+        'heavy': heavy,
+        'slowest': [(name, round(us / 1000, 1)) for name, us in slowest],
+        'error': result.stderr.strip().splitlines()[-1] if result.returncode else None,
+    }
+
+
+def main(targets):
+    status = 0
+
+    for target in targets:
+        report = profile_import(target)
+
+        if report['error']:
+            print(f"❌ {target}: import failed ({report['error']})")
+            status = max(status, 2)
+            continue
+
+        over_budget = report['total_ms'] > IMPORT_BUDGET_MS
+        mark = "❌" if over_budget or report['heavy'] else "✅"
+        print(f"{mark} {target}: {report['total_ms']:.0f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)")
+        if report['heavy']:
+            print(f"   imports admin-only packages: {', '.join(report['heavy'])}")
+        if over_budget or report['heavy']:
+            for name, ms in report['slowest']:
+                print(f"   {ms:8.1f} ms  {name}")
+            status = max(status, 1)
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:] or default_targets()))
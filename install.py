@@ -14,7 +14,8 @@ def install_dependencies():
     # List of required packages
     packages = [
         "streamlit==1.29.0",
-        "pandas==2.1.4", 
+        "pandas==2.1.4",
+        "numpy==1.26.2",
         "plotly==5.18.0",
         "Pillow==10.1.0"
     ]
@@ -0,0 +1,146 @@
+"""
+Role page registry for the dashboard navigation.
+
+Every role's pages are declared once in ROLE_PAGES. When the process
+starts the registry checks that each page's file exists, compiles, and
+resolves to an importable module, so a broken page is logged at boot
+(and left out of the menu) instead of failing when a user clicks it.
+Modules are imported on first use and kept, so switching pages costs a
+dict lookup; each import is timed for the warm-up report.
+"""
+
+import importlib
+import importlib.util
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# role -> [(menu label, icon, page file)]
+ROLE_PAGES = {
+    'student': [
+        ("Dashboard", "house", "pages/Student/1_Dashboard.py"),
+        ("Profile", "person", "pages/Student/2_Profile.py"),
+        ("Friends", "people", "pages/Student/3_Friends.py"),
+        ("Chat", "chat", "pages/Student/4_Chat.py"),
+        ("Groups", "group", "pages/Student/5_Groups.py"),
+        ("Confessions", "chat-heart", "pages/Student/6_Confessions.py"),
+        ("Events", "calendar-event", "pages/Student/7_Events.py"),
+        ("Settings", "gear", "pages/Student/8_Settings.py"),
+    ],
+    'alumni': [
+        ("Dashboard", None, "pages/Alumni/1_Dashboard.py"),
+        ("Profile", None, "pages/Alumni/2_Profile.py"),
+        ("Networking", None, "pages/Alumni/3_Networking.py"),
+        ("Chat", None, "pages/Alumni/4_Chat.py"),
+        ("Groups", None, "pages/Alumni/5_Groups.py"),
+        ("Events", None, "pages/Alumni/6_Events.py"),
+        ("Contributions", None, "pages/Alumni/7_Contributions.py"),
+        ("Settings", None, "pages/Alumni/8_Settings.py"),
+    ],
+    'admin': [
+        ("Dashboard", None, "pages/Admin/1_Dashboard.py"),
+        ("Student Management", None, "pages/Admin/2_Student_Management.py"),
+        ("Alumni Management", None, "pages/Admin/3_Alumni_Management.py"),
+        ("Announcements", None, "pages/Admin/4_Announcements.py"),
+        ("Confession Moderation", None, "pages/Admin/5_Confession_Moderation.py"),
+        ("Groups Management", None, "pages/Admin/6_Groups_Management.py"),
+        ("Analytics", None, "pages/Admin/7_Analytics.py"),
+    ],
+}
+
+
+class PageNotFoundError(LookupError):
+    """Raised for a page that is not registered or whose file is missing"""
+
+
+def _check_page(path, module):
+    """Return why the page cannot be loaded, or None if it looks importable"""
+    if not os.path.isfile(path):
+        return f"{path} does not exist"
+
+    try:
+        with open(path, encoding='utf-8') as source:
+            compile(source.read(), path, 'exec')
+    except SyntaxError as e:
+        return f"{path} does not compile: {e}"
+
+    try:
+        if importlib.util.find_spec(module) is None:
+            return f"{module} cannot be imported"
+    except ImportError as e:
+        return f"{module} cannot be imported: {e}"
+
+    return None
+
+
+class PageRegistry:
+    """Validated role -> page lookup with lazily imported, cached modules"""
+
+    def __init__(self, role_pages=ROLE_PAGES, strict=False):
+        self._pages = {}
+        self.unavailable = []   # (role, label, path, reason)
+
+        for role, pages in role_pages.items():
+            self._pages[role] = {}
+            for label, icon, path in pages:
+                module = os.path.splitext(path)[0].replace('/', '.')
+                reason = _check_page(path, module)
+                if reason is None:
+                    self._pages[role][label] = {'icon': icon, 'path': path, 'module': module}
+                else:
+                    self.unavailable.append((role, label, path, reason))
+                    logger.warning("%s page '%s' is not available: %s", role, label, reason)
+
+        if self.unavailable and strict:
+            raise PageNotFoundError("Unavailable pages: " + ", ".join(
+                f"{path} ({reason})" for _, _, path, reason in self.unavailable))
+
+        self._modules = {}
+        self._load_ms = {}
+        self._lock = threading.Lock()
+
+    def labels(self, role):
+        """Menu labels of the role's available pages, in menu order"""
+        return list(self._pages.get(role, {}))
+
+    def icon(self, role, label):
+        return self._pages[role][label]['icon']
+
+    def load(self, role, label):
+        """Return the page module, importing it on first use"""
+        page = self._pages.get(role, {}).get(label)
+        if page is None:
+            raise PageNotFoundError(f"No '{label}' page for role '{role}'")
+
+        module = self._modules.get(page['module'])
+        if module is not None:
+            return module
+
+        with self._lock:
+            if page['module'] not in self._modules:
+                started = time.perf_counter()
+                self._modules[page['module']] = importlib.import_module(page['module'])
+                self._load_ms[page['module']] = round((time.perf_counter() - started) * 1000, 1)
+            return self._modules[page['module']]
+
+    def preload(self):
+        """Import every available page; returns {module: ms or error}"""
+        results = {}
+        for role, pages in self._pages.items():
+            for label, page in pages.items():
+                try:
+                    self.load(role, label)
+                    results[page['module']] = self._load_ms.get(page['module'], 0.0)
+                except Exception as e:
+                    results[page['module']] = f"failed: {e}"
+        return results
+
+    def load_times(self):
+        """Import time in ms of each page loaded so far"""
+        return dict(self._load_ms)
+
+
+page_registry = PageRegistry(strict=os.environ.get("MES_CONNECT_STRICT_PAGES") == "1")
@@ -1,6 +1,7 @@
 import streamlit as st
-import pandas as pd
-from utils.database import get_db_connection
+from utils.database import get_db_connection, execute_query
+from utils.analytics import run_graph_analytics, run_group_recommendations
+from utils.events import archive_past_events
 
 def show():
     st.title("👑 Admin Dashboard")
@@ -14,27 +15,21 @@ def show():
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM users")
-        total_users = cursor.fetchone()[0]
+        total_users = execute_query("SELECT COUNT(*) FROM users")[0]
         st.metric("Total Users", total_users)
     
     with col2:
-        cursor.execute("SELECT COUNT(*) FROM users WHERE date(created_at) = date('now')")
-        new_today = cursor.fetchone()[0]
+        new_today = execute_query("SELECT COUNT(*) FROM users WHERE date(created_at) = date('now')")[0]
         st.metric("New Today", new_today)
     
     with col3:
-        cursor.execute("SELECT COUNT(*) FROM confessions WHERE approved_by_admin = 0")
-        pending_confessions = cursor.fetchone()[0]
+        pending_confessions = execute_query(
+            "SELECT COUNT(*) FROM confessions WHERE approved_by_admin = 0")[0]
         st.metric("Pending Confessions", pending_confessions)
     
     with col4:
         st.metric("Active Now", "N/A")
     
-    conn.close()
-    
     # Recent Activity
     st.subheader("🔄 Recent Activity")
     
@@ -78,11 +73,14 @@ def show():
             st.info("No pending confessions")
     
     conn.close()
-    
+
+    # Network Insights
+    show_network_insights()
+
     # Quick Actions
     st.subheader("⚡ Quick Actions")
     
-    col_btn1, col_btn2, col_btn3 = st.columns(3)
+    col_btn1, col_btn2, col_btn3, col_btn4 = st.columns(4)
     
     with col_btn1:
         if st.button("👥 Manage Users", use_container_width=True):
@@ -95,4 +93,88 @@ def show():
     with col_btn3:
         if st.button("📊 View Analytics", use_container_width=True):
             st.switch_page("pages/Admin/7_Analytics.py")
+    
+    with col_btn4:
+        if st.button("🗄️ Archive Past Events", use_container_width=True):
+            with st.spinner("Archiving past events..."):
+                result = archive_past_events()
+            st.success(f"Archived {result['events']} events and "
+                      f"{result['registrations']} registrations")
           
+
+def show_network_insights():
+    import pandas as pd  # admin-only, keep it out of the shared start-up imports
+    
+    st.subheader("🕸️ Network Insights")
+    
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute("SELECT * FROM graph_runs ORDER BY id DESC LIMIT 1")
+    last_run = cursor.fetchone()
+    
+    col_info, col_btn = st.columns([3, 1])
+    
+    with col_info:
+        if last_run:
+            st.caption(f"Last computed {last_run['computed_at']} in {last_run['duration_ms']} ms")
+        else:
+            st.info("Network statistics have not been computed yet.")
+    
+    with col_btn:
+        if st.button("🔄 Recompute", use_container_width=True):
+            with st.spinner("Analysing the network..."):
+                run_graph_analytics()
+                run_group_recommendations()
+            st.rerun()
+    
+    if not last_run:
+        conn.close()
+        return
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Users", last_run['user_count'])
+    
+    with col2:
+        st.metric("Friendships", last_run['friendship_count'])
+    
+    with col3:
+        st.metric("Communities", last_run['component_count'])
+    
+    with col4:
+        st.metric("Largest Community", last_run['largest_component'])
+    
+    col_deg, col_top = st.columns(2)
+    
+    with col_deg:
+        st.write("**Friend Count Distribution**")
+        cursor.execute("SELECT degree, user_count FROM graph_degree_distribution ORDER BY degree")
+        distribution = cursor.fetchall()
+        
+        if distribution:
+            df = pd.DataFrame(distribution, columns=['Friends', 'Users']).set_index('Friends')
+            st.bar_chart(df)
+    
+    with col_top:
+        st.write("**Top Connectors**")
+        cursor.execute('''
+            SELECT gs.connector_rank, gs.degree, gs.group_count, gs.component_id,
+                   COALESCE(s.full_name, a.full_name, u.username) as display_name
+            FROM graph_user_stats gs
+            JOIN users u ON gs.user_id = u.id
+            LEFT JOIN students s ON u.id = s.user_id
+            LEFT JOIN alumni a ON u.id = a.user_id
+            WHERE gs.connector_rank IS NOT NULL
+            ORDER BY gs.connector_rank
+            LIMIT 10
+        ''')
+        connectors = cursor.fetchall()
+        
+        if connectors:
+            df = pd.DataFrame(connectors, columns=['Rank', 'Friends', 'Groups', 'Community', 'Name'])
+            st.dataframe(df[['Rank', 'Name', 'Friends', 'Groups', 'Community']],
+                         use_container_width=True, hide_index=True)
+    
+    conn.close()
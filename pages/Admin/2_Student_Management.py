@@ -1,6 +1,12 @@
 import streamlit as st
-import pandas as pd
+import io
+import os
+from datetime import datetime
 from utils.database import get_db_connection
+from utils.groups import sync_cohort_groups
+from utils.students import (IMPORT_COLUMNS, STUDENT_COLUMNS, STUDENT_PAGE_SIZE, count_students,
+                            export_to_file, get_student, import_students_csv, list_students_page,
+                            parquet_available, remove_export_file, sweep_export_files)
 
 def show():
     st.title("👥 Student Management")
@@ -10,7 +16,7 @@ def show():
         st.error("Access denied. Admin privileges required.")
         return
     
-    tab1, tab2, tab3 = st.tabs(["All Students", "Add Student", "Reports"])
+    tab1, tab2, tab3, tab4 = st.tabs(["All Students", "Add Student", "Reports", "Export"])
     
     with tab1:
         show_all_students()
@@ -20,12 +26,17 @@ def show():
     
     with tab3:
         show_reports()
+    
+    with tab4:
+        show_export()
 
 def show_all_students():
+    import pandas as pd  # admin-only, keep it out of the shared start-up imports
+    
     st.subheader("All Students")
     
     # Search and filters
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         search = st.text_input("Search by name or roll number")
@@ -43,85 +54,87 @@ def show_all_students():
             ["All", "2020-2024", "2021-2025", "2022-2026", "2023-2027", "2024-2028"]
         )
     
-    # Get students
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    with col4:
+        sort_by = st.selectbox("Sort by", ["Newest", "Oldest", "Name"])
+    
+    filters = {
+        'search': search or None,
+        'department': department if department != "All" else None,
+        'batch': batch if batch != "All" else None,
+    }
+    
+    # Keyset pagination: keep the cursors of the pages visited for this filter
+    page_key = (search, department, batch, sort_by)
+    if st.session_state.get('student_table_filters') != page_key:
+        st.session_state.student_table_filters = page_key
+        st.session_state.student_table_cursors = [None]
+    
+    total = count_students(**filters)
+    columns, rows, next_cursor = list_students_page(
+        **filters,
+        sort=sort_by.lower(),
+        after=st.session_state.student_table_cursors[-1]
+    )
+    
+    if rows:
+        # Typed columns straight from the cursor rows
+        df = pd.DataFrame.from_records(rows, columns=columns).astype(
+            {label: dtype for label, _, dtype in STUDENT_COLUMNS})
+        st.dataframe(df, use_container_width=True, hide_index=True,
+                     column_config={"Joined": st.column_config.DateColumn("Joined")})
+        
+        # Page navigation
+        page_number = len(st.session_state.student_table_cursors)
+        col_prev, col_page, col_next = st.columns([1, 3, 1])
+        
+        with col_prev:
+            if page_number > 1:
+                if st.button("⬅️ Previous", key="students_prev"):
+                    st.session_state.student_table_cursors.pop()
+                    st.rerun()
+        
+        with col_page:
+            pages = max(1, -(-total // STUDENT_PAGE_SIZE))
+            st.caption(f"Page {page_number} of {pages} • {total} students")
+        
+        with col_next:
+            if next_cursor:
+                if st.button("Next ➡️", key="students_next"):
+                    st.session_state.student_table_cursors.append(next_cursor)
+                    st.rerun()
+    else:
+        st.info("No students found")
     
-    query = '''
-        SELECT 
-            u.id, u.username, u.email, u.created_at, u.is_active,
-            s.full_name, s.batch, s.department, s.roll_number, s.contact_number
-        FROM users u
-        JOIN students s ON u.id = s.user_id
-        WHERE u.role = 'student'
-    '''
-    
-    params = []
-    
-    if search:
-        query += " AND (s.full_name LIKE ? OR s.roll_number LIKE ? OR u.username LIKE ?)"
-        search_term = f"%{search}%"
-        params.extend([search_term, search_term, search_term])
-    
-    if department != "All":
-        query += " AND s.department = ?"
-        params.append(department)
-    
-    if batch != "All":
-        query += " AND s.batch = ?"
-        params.append(batch)
-    
-    query += " ORDER BY u.created_at DESC"
-    
-    cursor.execute(query, tuple(params))
-    students = cursor.fetchall()
-    
-    if students:
-        # Convert to DataFrame for display
-        df_data = []
-        for student in students:
-            df_data.append({
-                'ID': student['id'],
-                'Name': student['full_name'],
-                'Username': student['username'],
-                'Roll No': student['roll_number'],
-                'Batch': student['batch'],
-                'Department': student['department'],
-                'Email': student['email'],
-                'Joined': student['created_at'][:10],
-                'Status': 'Active' if student['is_active'] else 'Inactive'
-            })
-        
-        df = pd.DataFrame(df_data)
-        st.dataframe(df, use_container_width=True, hide_index=True)
-        
-        # Actions for selected student
-        st.subheader("Student Actions")
-        
-        selected_id = st.selectbox(
-            "Select Student ID",
-            [student['id'] for student in students]
-        )
+    # Actions for a student looked up by id
+    st.subheader("Student Actions")
+    
+    selected_id = st.number_input("Student ID", min_value=1, step=1, value=None)
+    
+    if selected_id:
+        student = get_student(int(selected_id))
+        
+        if not student:
+            st.warning(f"No student with ID {int(selected_id)}")
+            return
+        
+        st.write(f"**{student['Name']}** ({student['Roll No']}) • {student['Department']} • "
+                 f"{student['Batch']} • {student['Status']}")
         
         col_a1, col_a2, col_a3 = st.columns(3)
         
         with col_a1:
             if st.button("View Profile", use_container_width=True):
-                view_student_profile(selected_id)
+                view_student_profile(student['ID'])
         
         with col_a2:
             if st.button("Deactivate/Activate", use_container_width=True):
-                toggle_student_status(selected_id)
+                toggle_student_status(student['ID'])
                 st.rerun()
         
         with col_a3:
             if st.button("Delete Student", use_container_width=True):
-                delete_student(selected_id)
+                delete_student(student['ID'])
                 st.rerun()
-    else:
-        st.info("No students found")
-    
-    conn.close()
 
 def add_student():
     st.subheader("Add New Student")
@@ -173,8 +186,48 @@ def add_student():
                     st.balloons()
                 else:
                     st.error(f"Failed to add student: {message}")
+    
+    st.divider()
+    bulk_import_students()
+
+def bulk_import_students():
+    st.subheader("Bulk Import from CSV")
+    st.caption(f"Columns: {', '.join(IMPORT_COLUMNS)} (contact_number is optional). "
+               "Rows with errors are skipped and listed; the rest are imported.")
+    
+    st.download_button(
+        "📄 Download CSV template",
+        data=",".join(IMPORT_COLUMNS) + "\n",
+        file_name="students_template.csv",
+        mime="text/csv"
+    )
+    
+    uploaded = st.file_uploader("Students CSV", type=["csv"])
+    
+    if uploaded and st.button("📥 Import Students", type="primary"):
+        with st.spinner("Importing students..."):
+            try:
+                result = import_students_csv(io.TextIOWrapper(uploaded, encoding="utf-8-sig", newline=""))
+            except (ValueError, UnicodeDecodeError) as e:
+                st.error(f"Could not read the file: {e}")
+                return
+            
+            if result['imported']:
+                # New students join their department and batch groups
+                sync_cohort_groups(creator_id=st.session_state.user_id)
+        
+        st.success(f"Imported {result['imported']} students")
+        
+        if result['errors']:
+            st.warning(f"{len(result['errors'])} rows were skipped")
+            st.dataframe(
+                [{'Line': line, 'Error': message} for line, message in result['errors']],
+                use_container_width=True, hide_index=True
+            )
 
 def show_reports():
+    import pandas as pd
+    
     st.subheader("Student Reports")
     
     # Statistics
@@ -210,6 +263,84 @@ def show_reports():
         st.dataframe(df, use_container_width=True)
     
     conn.close()
+    
+    # Cohort groups
+    st.subheader("Department & Batch Groups")
+    st.caption("Membership of department and batch groups follows each student's profile. "
+               "Sync after bulk imports or profile changes.")
+    
+    if st.button("🔄 Sync Cohort Groups"):
+        with st.spinner("Syncing groups..."):
+            result = sync_cohort_groups(creator_id=st.session_state.user_id)
+        st.success(f"Synced: {result['groups_created']} groups created, "
+                   f"{result['members_added']} members added, "
+                   f"{result['members_removed']} removed")
+
+def show_export():
+    st.subheader("Export Data")
+    st.caption("Rows are streamed from the database in chunks, so large exports do not "
+               "load every record at once.")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        dataset = st.selectbox("Dataset", ["Students", "Alumni"])
+    
+    with col2:
+        formats = ["CSV", "Parquet"] if parquet_available() else ["CSV"]
+        fmt = st.selectbox("Format", formats)
+    
+    filters = {}
+    if dataset == "Students":
+        use_filters = st.checkbox("Apply the All Students search and filters")
+        if use_filters and st.session_state.get('student_table_filters'):
+            search, department, batch, _ = st.session_state.student_table_filters
+            filters = {
+                'search': search or None,
+                'department': department if department != "All" else None,
+                'batch': batch if batch != "All" else None,
+            }
+    
+    if not parquet_available():
+        st.caption("Install pyarrow to enable Parquet exports.")
+    
+    if st.button("📦 Prepare Export", type="primary"):
+        extension = fmt.lower()
+        
+        # Files from sessions that ended without replacing their export
+        sweep_export_files()
+        
+        with st.spinner("Exporting..."):
+            # Written to disk chunk by chunk; kept across reruns until replaced
+            try:
+                path, written = export_to_file(dataset.lower(), extension, **filters)
+            except Exception as e:
+                st.error(f"Export failed: {e}")
+                return
+        
+        previous = st.session_state.get('student_export')
+        if previous:
+            remove_export_file(previous['path'])
+        
+        st.session_state.student_export = {
+            'path': path,
+            'label': f"⬇️ Download {fmt}",
+            'summary': f"Exported {written} {dataset.lower()}",
+            'file_name': f"{dataset.lower()}_{datetime.now().strftime('%Y%m%d_%H%M')}.{extension}",
+            'mime': "text/csv" if extension == 'csv' else "application/octet-stream",
+        }
+    
+    export = st.session_state.get('student_export')
+    if export and os.path.exists(export['path']):
+        st.success(export['summary'])
+        with open(export['path'], 'rb') as exported:
+            st.download_button(
+                export['label'],
+                data=exported,
+                file_name=export['file_name'],
+                mime=export['mime'],
+                use_container_width=True
+            )
 
 def view_student_profile(student_id):
     st.info(f"Viewing profile of student {student_id}")
@@ -1,5 +1,7 @@
 import streamlit as st
-from utils.database import get_db_connection
+from utils.database import get_db_connection, get_dashboard_snapshot
+from utils.events import register_for_event, upcoming_events_page, get_upcoming_reminders
+from utils.groups import get_recommended_groups, join_group
 
 def show():
     st.title("🎓 Student Dashboard")
@@ -25,36 +27,21 @@ def show():
     # Quick Stats
     st.subheader("📊 Your Overview")
     
+    snapshot = get_dashboard_snapshot(st.session_state.user_id)
+    
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        # Friends count
-        cursor.execute("SELECT COUNT(*) FROM connections WHERE user_id = ? AND status = 'accepted'", 
-                      (st.session_state.user_id,))
-        friends_count = cursor.fetchone()[0]
-        st.metric("👥 Friends", friends_count)
+        st.metric("👥 Friends", snapshot['friends'])
     
     with col2:
-        # Upcoming events count
-        cursor.execute("""SELECT COUNT(*) FROM event_registrations er 
-                       JOIN events e ON er.event_id = e.id 
-                       WHERE er.user_id = ? AND e.event_date >= date('now')""", 
-                      (st.session_state.user_id,))
-        events_count = cursor.fetchone()[0]
-        st.metric("📅 Events", events_count)
+        st.metric("📅 Events", snapshot['upcoming_events'])
     
     with col3:
-        # Groups count
-        cursor.execute("SELECT COUNT(*) FROM group_members WHERE user_id = ?", 
-                      (st.session_state.user_id,))
-        groups_count = cursor.fetchone()[0]
-        st.metric("👥 Groups", groups_count)
+        st.metric("👥 Groups", snapshot['groups'])
     
     with col4:
-        # Unread messages
-        cursor.execute("SELECT COUNT(*) FROM messages WHERE receiver_id = ? AND is_read = 0", 
-                      (st.session_state.user_id,))
-        unread_msg = cursor.fetchone()[0]
+        unread_msg = snapshot['unread_messages']
         st.metric("💬 Messages", unread_msg, delta="unread" if unread_msg > 0 else None)
     
     conn.close()
@@ -66,19 +53,7 @@ def show():
         # Upcoming Events
         st.subheader("📅 Upcoming Events")
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT e.*, 
-                   (SELECT COUNT(*) FROM event_registrations WHERE event_id = e.id) as registered
-            FROM events e
-            WHERE e.event_date >= date('now')
-            AND e.is_active = 1
-            ORDER BY e.event_date
-            LIMIT 5
-        ''')
-        
-        events = cursor.fetchall()
+        events, _ = upcoming_events_page(st.session_state.user_id, page_size=5)
         
         if events:
             for event in events:
@@ -89,27 +64,25 @@ def show():
                         st.caption(f"📅 {event['event_date']} | 🕒 {event['event_time']}")
                         st.caption(f"📍 {event['location']}")
                         if event['max_participants']:
-                            progress = min(event['registered']/event['max_participants'], 1)
-                            st.progress(progress, text=f"{event['registered']}/{event['max_participants']} registered")
+                            progress = min(event['registered_count']/event['max_participants'], 1)
+                            st.progress(progress, text=f"{event['registered_count']}/{event['max_participants']} registered")
                     with e_col2:
-                        # Check if already registered
-                        cursor.execute("SELECT id FROM event_registrations WHERE event_id = ? AND user_id = ?",
-                                     (event['id'], st.session_state.user_id))
-                        if cursor.fetchone():
+                        if event['is_registered']:
                             st.success("✅ Registered")
+                        elif event['is_waitlisted']:
+                            st.info("⏳ Waitlisted")
                         else:
                             if st.button("Register", key=f"reg_{event['id']}"):
-                                cursor.execute("INSERT INTO event_registrations (event_id, user_id) VALUES (?, ?)",
-                                             (event['id'], st.session_state.user_id))
-                                conn.commit()
-                                st.success("Registered successfully!")
-                                st.rerun()
+                                success, message = register_for_event(event['id'], st.session_state.user_id)
+                                if success:
+                                    st.success("Registered successfully!")
+                                    st.rerun()
+                                else:
+                                    st.error(message)
                     st.divider()
         else:
             st.info("No upcoming events. Check back later!")
         
-        conn.close()
-        
         # Recent Confessions
         st.subheader("💬 Recent Confessions")
         
@@ -178,48 +151,39 @@ def show():
         st.divider()
         
         # Study Groups
-        st.subheader("📚 Study Groups")
+        st.subheader("📚 Groups For You")
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT g.*, 
-                   (SELECT COUNT(*) FROM group_members WHERE group_id = g.id) as member_count
-            FROM groups g
-            WHERE g.group_type = 'study' 
-            AND g.is_public = 1
-            AND g.id NOT IN (SELECT group_id FROM group_members WHERE user_id = ?)
-            LIMIT 3
-        ''', (st.session_state.user_id,))
-        
-        study_groups = cursor.fetchall()
+        study_groups = get_recommended_groups(st.session_state.user_id)
         
         if study_groups:
             for group in study_groups:
                 st.write(f"**{group['name']}**")
-                st.caption(f"👥 {group['member_count']} members")
+                st.caption(f"👥 {group['member_count']} members • "
+                          f"🏷️ {group['group_type'].replace('_', ' ').title()}")
                 if st.button("Join", key=f"join_{group['id']}", size="small"):
-                    cursor.execute("INSERT INTO group_members (group_id, user_id) VALUES (?, ?)",
-                                 (group['id'], st.session_state.user_id))
-                    conn.commit()
-                    st.success("Successfully joined the group!")
-                    st.rerun()
+                    if join_group(group['id'], st.session_state.user_id):
+                        st.success("Successfully joined the group!")
+                        st.rerun()
+                    else:
+                        st.error("This group can no longer be joined")
                 st.divider()
         
-        conn.close()
-        
         # Deadlines/Reminders
         st.subheader("⏰ Reminders")
         
-        deadlines = [
-            {"task": "Project Submission", "date": "2024-01-25"},
-            {"task": "Exam Registration", "date": "2024-01-28"},
-            {"task": "Scholarship Apply", "date": "2024-01-30"},
-        ]
-        
-        from datetime import datetime
-        for deadline in deadlines:
-            days_left = (datetime.strptime(deadline['date'], "%Y-%m-%d") - datetime.now()).days
-            st.write(f"**{deadline['task']}**")
-            st.caption(f"⏳ {days_left} days left")
-            st.progress(max(0, 1 - days_left/30))
+        reminders = get_upcoming_reminders(st.session_state.user_id)
+        
+        from datetime import date
+        if reminders:
+            for reminder in reminders:
+                # Calendar days, so an event tomorrow morning is "1 day" away
+                days_left = (date.fromisoformat(reminder['due_at'][:10]) - date.today()).days
+                if reminder['kind'] == 'event':
+                    st.write(f"**{reminder['title']}**")
+                    st.caption(f"📅 Starts in {days_left} days" if days_left > 0 else "📅 Starts today")
+                else:
+                    st.write(f"**{reminder['title']}** registration closes")
+                    st.caption(f"⏳ {days_left} days left" if days_left > 0 else "⏳ Closes today")
+                st.progress(min(1.0, max(0, 1 - days_left/30)))
+        else:
+            st.info("Nothing due. Register for an event to get reminders here.")
@@ -1,5 +1,10 @@
 import streamlit as st
+import html
 from utils.database import get_db_connection
+from utils.groups import (discover_groups_page, get_group_messages, get_group_unread_counts,
+                          join_group, mark_group_read, send_group_message)
+
+GROUP_CHAT_PAGE_SIZE = 50
 
 def show():
     st.title("👥 Groups")
@@ -16,8 +21,14 @@ def show():
         create_group()
 
 def show_my_groups():
+    if st.session_state.get('current_group'):
+        show_group_chat(st.session_state.current_group)
+        return
+    
     st.subheader("Groups You're In")
     
+    unread_counts = get_group_unread_counts(st.session_state.user_id)
+    
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -25,7 +36,6 @@ def show_my_groups():
         SELECT 
             g.*,
             gm.role,
-            (SELECT COUNT(*) FROM group_members WHERE group_id = g.id) as member_count,
             COALESCE(s.full_name, a.full_name, u.username) as creator_name
         FROM groups g
         JOIN group_members gm ON g.id = gm.group_id
@@ -55,6 +65,9 @@ def show_my_groups():
                     st.caption(f"👥 {group['member_count']} members • "
                               f"🏷️ {group['group_type'].replace('_', ' ').title()}")
                     
+                    if unread_counts.get(group['id']):
+                        st.caption(f"💬 {unread_counts[group['id']]} unread")
+                    
                     # Show your role
                     if group['role'] == 'admin':
                         st.caption("👑 You are an admin")
@@ -63,7 +76,8 @@ def show_my_groups():
                 
                 with col3:
                     if st.button("Enter", key=f"enter_{group['id']}"):
-                        show_group_chat(group['id'])
+                        st.session_state.current_group = group['id']
+                        st.rerun()
                     
                     if group['role'] in ['admin', 'moderator']:
                         if st.button("Manage", key=f"manage_{group['id']}"):
@@ -99,47 +113,26 @@ def discover_groups():
             ["All", "Public Only", "Private Only"]
         )
     
-    # Get groups
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    query = '''
-        SELECT 
-            g.*,
-            (SELECT COUNT(*) FROM group_members WHERE group_id = g.id) as member_count,
-            COALESCE(s.full_name, a.full_name, u.username) as creator_name,
-            EXISTS(SELECT 1 FROM group_members WHERE group_id = g.id AND user_id = ?) as is_member
-        FROM groups g
-        JOIN users u ON g.creator_id = u.id
-        LEFT JOIN students s ON u.id = s.user_id
-        LEFT JOIN alumni a ON u.id = a.user_id
-        WHERE g.id NOT IN (
-            SELECT group_id FROM group_members 
-            WHERE user_id = ? AND is_banned = 1
-        )
-    '''
-    
-    params = [st.session_state.user_id, st.session_state.user_id]
-    
-    if group_type != "All":
-        query += " AND g.group_type = ?"
-        params.append(group_type.lower())
+    sort_keys = {
+        "Most Members": "member_count",
+        "Recently Created": "created_at",
+        "Alphabetical": "name"
+    }
     
-    if privacy == "Public Only":
-        query += " AND g.is_public = 1"
-    elif privacy == "Private Only":
-        query += " AND g.is_public = 0"
+    # Keyset pagination: keep the cursors of the pages visited for this filter
+    filters = (group_type, sort_by, privacy)
+    if st.session_state.get('discover_filters') != filters:
+        st.session_state.discover_filters = filters
+        st.session_state.discover_cursors = [None]
     
-    # Sorting
-    if sort_by == "Most Members":
-        query += " ORDER BY member_count DESC"
-    elif sort_by == "Recently Created":
-        query += " ORDER BY g.created_at DESC"
-    elif sort_by == "Alphabetical":
-        query += " ORDER BY g.name ASC"
-    
-    cursor.execute(query, tuple(params))
-    groups = cursor.fetchall()
+    # Get groups
+    groups, next_cursor = discover_groups_page(
+        st.session_state.user_id,
+        group_type=group_type.lower() if group_type != "All" else None,
+        is_public={"Public Only": True, "Private Only": False}.get(privacy),
+        sort=sort_keys[sort_by],
+        after=st.session_state.discover_cursors[-1]
+    )
     
     if groups:
         for group in groups:
@@ -163,25 +156,41 @@ def discover_groups():
                 with col3:
                     if group['is_member']:
                         st.success("✅ Joined")
+                    elif group['cohort_value']:
+                        st.caption("🔄 Members added automatically")
                     else:
                         if group['is_public']:
                             if st.button("Join", key=f"join_{group['id']}"):
-                                cursor.execute('''
-                                    INSERT INTO group_members (group_id, user_id)
-                                    VALUES (?, ?)
-                                ''', (group['id'], st.session_state.user_id))
-                                conn.commit()
-                                st.success("Successfully joined the group!")
-                                st.rerun()
+                                if join_group(group['id'], st.session_state.user_id):
+                                    st.success("Successfully joined the group!")
+                                    st.rerun()
+                                else:
+                                    st.error("This group can no longer be joined")
                         else:
                             if st.button("Request", key=f"req_{group['id']}"):
                                 st.info("Request to join feature coming soon!")
                 
                 st.divider()
+        
+        # Page navigation
+        col_prev, col_page, col_next = st.columns([1, 3, 1])
+        
+        with col_prev:
+            if len(st.session_state.discover_cursors) > 1:
+                if st.button("⬅️ Previous", key="discover_prev"):
+                    st.session_state.discover_cursors.pop()
+                    st.rerun()
+        
+        with col_page:
+            st.caption(f"Page {len(st.session_state.discover_cursors)}")
+        
+        with col_next:
+            if next_cursor:
+                if st.button("Next ➡️", key="discover_next"):
+                    st.session_state.discover_cursors.append(next_cursor)
+                    st.rerun()
     else:
         st.info("No groups found. Try different filters!")
-    
-    conn.close()
 
 def create_group():
     st.subheader("Create New Group")
@@ -233,7 +242,125 @@ def create_group():
                     st.error("Failed to create group. Please try again.")
 
 def show_group_chat(group_id):
-    st.info(f"Group chat feature for group {group_id} would open here")
+    """Display a group's chat"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT g.name, g.member_count, gm.id IS NOT NULL as is_member
+        FROM groups g
+        LEFT JOIN group_members gm
+            ON gm.group_id = g.id AND gm.user_id = ? AND gm.is_banned = 0
+        WHERE g.id = ?
+    ''', (st.session_state.user_id, group_id))
+    group = cursor.fetchone()
+    conn.close()
+    
+    if not group:
+        st.session_state.current_group = None
+        st.error("Group not found")
+        return
+    
+    # Only current, non-banned members may read the chat
+    if not group['is_member']:
+        st.session_state.current_group = None
+        st.error("You are not a member of this group")
+        return
+    
+    # Chat header
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        st.subheader(f"💬 {group['name']}")
+        st.caption(f"👥 {group['member_count']} members")
+    with col2:
+        if st.button("⬅️ Back", use_container_width=True):
+            st.session_state.current_group = None
+            st.session_state.group_chat_before = None
+            st.rerun()
+    
+    st.divider()
+    
+    # Older history is paged with the id of the oldest message shown
+    before_id = st.session_state.get('group_chat_before')
+    messages = get_group_messages(group_id, before_id=before_id, limit=GROUP_CHAT_PAGE_SIZE)
+    
+    col_older, col_latest = st.columns(2)
+    with col_older:
+        if len(messages) == GROUP_CHAT_PAGE_SIZE:
+            if st.button("⬆️ Load older", use_container_width=True):
+                st.session_state.group_chat_before = messages[0]['id']
+                st.rerun()
+    with col_latest:
+        if before_id:
+            if st.button("⬇️ Back to latest", use_container_width=True):
+                st.session_state.group_chat_before = None
+                st.rerun()
+    
+    # Messages container
+    messages_container = st.container(height=400)
+    
+    with messages_container:
+        if not messages:
+            st.info("No messages yet. Say hello!")
+        
+        for msg in messages:
+            if msg['sender_id'] == st.session_state.user_id:
+                # Right aligned (sent messages)
+                st.markdown(f"""
+                    <div style='text-align: right; margin: 10px 0;'>
+                        <div style='background-color: #3B82F6; color: white; 
+                                    padding: 10px; border-radius: 15px 15px 0 15px;
+                                    display: inline-block; max-width: 70%;'>
+                            {html.escape(msg['message'])}
+                        </div>
+                        <div style='font-size: 0.8em; color: #666;'>
+                            {msg['timestamp'][11:16]}
+                        </div>
+                    </div>
+                """, unsafe_allow_html=True)
+            else:
+                # Left aligned (received messages)
+                st.markdown(f"""
+                    <div style='text-align: left; margin: 10px 0;'>
+                        <div style='font-size: 0.8em; color: #666;'>
+                            {html.escape(msg['sender_name'])}
+                        </div>
+                        <div style='background-color: #E5E7EB; color: black; 
+                                    padding: 10px; border-radius: 15px 15px 15px 0;
+                                    display: inline-block; max-width: 70%;'>
+                            {html.escape(msg['message'])}
+                        </div>
+                        <div style='font-size: 0.8em; color: #666;'>
+                            {msg['timestamp'][11:16]}
+                        </div>
+                    </div>
+                """, unsafe_allow_html=True)
+    
+    # Viewing the latest page means everything up to the newest message is read
+    if messages and not before_id:
+        mark_group_read(group_id, st.session_state.user_id, messages[-1]['id'])
+    
+    # Message input
+    st.divider()
+    
+    col1, col2 = st.columns([5, 1])
+    
+    with col1:
+        message = st.text_input(
+            "Type a message...",
+            key=f"group_message_input_{group_id}",
+            placeholder="Press Enter to send",
+            label_visibility="collapsed"
+        )
+    
+    with col2:
+        send_btn = st.button("Send", type="primary", use_container_width=True)
+    
+    if send_btn and message:
+        if send_group_message(group_id, st.session_state.user_id, message):
+            st.session_state.group_chat_before = None
+            st.rerun()
+        else:
+            st.error("You can't post in this group.")
 
 def manage_group(group_id):
     st.info(f"Group management for group {group_id}")
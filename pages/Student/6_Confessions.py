@@ -1,5 +1,5 @@
 import streamlit as st
-from utils.database import get_db_connection
+from utils.database import get_db_connection, execute_query
 
 def show():
     st.title("💖 Confessions")
@@ -83,10 +83,7 @@ def view_confessions():
             ["Most Recent", "Most Liked"]
         )
     
-    # Get confessions
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
+    # Get confessions (shared by every session through the query cache)
     query = '''
         SELECT c.*,
                COALESCE(s.full_name, a.full_name, u.username) as author_name
@@ -111,16 +108,13 @@ def view_confessions():
     
     query += " LIMIT 20"
     
-    cursor.execute(query, tuple(params))
-    confessions = cursor.fetchall()
+    confessions = execute_query(query, tuple(params), fetch_all=True)
     
     if confessions:
         for confession in confessions:
             display_confession(confession)
     else:
         st.info("No confessions found. Be the first to post!")
-    
-    conn.close()
 
 def my_confessions():
     st.subheader("My Confessions")
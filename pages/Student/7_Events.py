@@ -1,51 +1,133 @@
 import streamlit as st
 from datetime import datetime
 from utils.database import get_db_connection
+from utils.checkin import get_checkin_queue
+from utils.events import (cancel_registration, export_event_type_calendar, export_user_calendar,
+                          get_past_event_stats, get_waitlist_position, join_waitlist,
+                          leave_waitlist,
+                          recommended_events, register_for_event, upcoming_events_page)
 
 def show():
     st.title("📅 Events")
     
-    tab1, tab2, tab3 = st.tabs(["Upcoming Events", "My Events", "Create Event"])
+    tab1, tab2, tab3, tab4 = st.tabs(["Upcoming Events", "For You", "My Events", "Create Event"])
     
     with tab1:
         upcoming_events()
     
     with tab2:
-        my_events()
+        events_for_you()
     
     with tab3:
+        my_events()
+    
+    with tab4:
         create_event()
 
 def upcoming_events():
     st.subheader("🎯 Upcoming Events")
     
-    # Get events
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    window = st.selectbox(
+        "Show events in",
+        ["Next 7 days", "Next 30 days", "Next 90 days", "All upcoming"],
+        index=1
+    )
+    window_days = {"Next 7 days": 7, "Next 30 days": 30, "Next 90 days": 90}.get(window)
     
-    cursor.execute('''
-        SELECT e.*,
-               COALESCE(s.full_name, a.full_name, u.username) as organizer_name,
-               (SELECT COUNT(*) FROM event_registrations WHERE event_id = e.id) as registered_count,
-               EXISTS(SELECT 1 FROM event_registrations WHERE event_id = e.id AND user_id = ?) as is_registered
-        FROM events e
-        JOIN users u ON e.organizer_id = u.id
-        LEFT JOIN students s ON u.id = s.user_id
-        LEFT JOIN alumni a ON u.id = a.user_id
-        WHERE e.event_date >= date('now')
-        AND e.is_active = 1
-        ORDER BY e.event_date
-    ''', (st.session_state.user_id,))
+    # Keyset pagination: keep the cursors of the pages visited for this window
+    if st.session_state.get('events_window') != window:
+        st.session_state.events_window = window
+        st.session_state.events_cursors = [None]
     
-    events = cursor.fetchall()
+    # Get events
+    events, next_cursor = upcoming_events_page(
+        st.session_state.user_id,
+        window_days=window_days,
+        after=st.session_state.events_cursors[-1]
+    )
     
     if events:
         for event in events:
             display_event_card(event, show_register=True)
+        
+        # Page navigation
+        col_prev, col_page, col_next = st.columns([1, 3, 1])
+        
+        with col_prev:
+            if len(st.session_state.events_cursors) > 1:
+                if st.button("⬅️ Previous", key="events_prev"):
+                    st.session_state.events_cursors.pop()
+                    st.rerun()
+        
+        with col_page:
+            st.caption(f"Page {len(st.session_state.events_cursors)}")
+        
+        with col_next:
+            if next_cursor:
+                if st.button("Next ➡️", key="events_next"):
+                    st.session_state.events_cursors.append(next_cursor)
+                    st.rerun()
     else:
         st.info("No upcoming events found.")
     
-    conn.close()
+    # Calendar subscription
+    with st.expander("📆 Add events to your calendar"):
+        calendar_type = st.selectbox(
+            "Event type",
+            ["all", "workshop", "seminar", "hackathon", "social", "career_fair", "other"],
+            format_func=lambda t: "All events" if t == "all" else t.replace('_', ' ').title(),
+            key="calendar_type"
+        )
+        _, ics = export_event_type_calendar(None if calendar_type == "all" else calendar_type)
+        st.download_button(
+            "⬇️ Download .ics",
+            data=ics,
+            file_name=f"mes_connect_{calendar_type}_events.ics",
+            mime="text/calendar",
+            key="download_type_calendar"
+        )
+
+def events_for_you():
+    st.subheader("✨ Picked For You")
+    st.caption("Based on the events you've joined, your department and where your friends are going")
+    
+    events = recommended_events(st.session_state.user_id, limit=10)
+    
+    if not events:
+        st.info("No upcoming events to recommend right now.")
+        return
+    
+    for event in events:
+        with st.container():
+            col1, col2 = st.columns([4, 1])
+            
+            with col1:
+                st.write(f"**{event['title']}**")
+                st.caption(f"📅 {event['event_date']} | 🕒 {event['event_time']} | "
+                          f"📍 {event['location']} | 👤 {event['organizer_name']}")
+                if event['friends_going']:
+                    st.caption(f"👥 {event['friends_going']} friend(s) going")
+            
+            with col2:
+                is_full = event['max_participants'] and event['registered_count'] >= event['max_participants']
+                if event['is_waitlisted']:
+                    st.info("⏳ Waitlisted")
+                elif is_full:
+                    if st.button("Join Waitlist", key=f"fy_wait_{event['id']}"):
+                        success, message = join_waitlist(event['id'], st.session_state.user_id)
+                        if success:
+                            st.rerun()
+                        else:
+                            st.error(message)
+                elif st.button("Register", key=f"fy_reg_{event['id']}"):
+                    success, message = register_for_event(event['id'], st.session_state.user_id)
+                    if success:
+                        st.success(message)
+                        st.rerun()
+                    else:
+                        st.error(message)
+            
+            st.divider()
 
 def my_events():
     st.subheader("📋 My Events")
@@ -59,20 +141,30 @@ def my_events():
         cursor.execute('''
             SELECT e.*,
                    COALESCE(s.full_name, a.full_name, u.username) as organizer_name,
-                   er.attendance_status
+                   er.attendance_status,
+                   er.checkin_code
             FROM events e
             JOIN event_registrations er ON e.id = er.event_id
             JOIN users u ON e.organizer_id = u.id
             LEFT JOIN students s ON u.id = s.user_id
             LEFT JOIN alumni a ON u.id = a.user_id
             WHERE er.user_id = ?
-            AND e.event_date >= date('now')
+            AND e.event_date >= date('now', 'localtime')
             ORDER BY e.event_date
         ''', (st.session_state.user_id,))
         
-        attending_events = cursor.fetchall()
+        attending_events = [dict(row) for row in cursor.fetchall()]
         
         if attending_events:
+            _, ics = export_user_calendar(st.session_state.user_id)
+            st.download_button(
+                "📆 Export to calendar (.ics)",
+                data=ics,
+                file_name="my_mes_connect_events.ics",
+                mime="text/calendar",
+                key="download_my_calendar"
+            )
+            
             for event in attending_events:
                 display_event_card(event, show_status=True)
         else:
@@ -81,12 +173,15 @@ def my_events():
         conn.close()
     
     with tab_organizing:
+        if st.session_state.get('checkin_event'):
+            show_checkin_panel(st.session_state.checkin_event)
+            return
+        
         conn = get_db_connection()
         cursor = conn.cursor()
         
         cursor.execute('''
-            SELECT e.*,
-                   (SELECT COUNT(*) FROM event_registrations WHERE event_id = e.id) as registered_count
+            SELECT e.*
             FROM events e
             WHERE e.organizer_id = ?
             ORDER BY e.event_date
@@ -101,6 +196,15 @@ def my_events():
             st.info("You haven't organized any events yet.")
         
         conn.close()
+        
+        past_events = get_past_event_stats(st.session_state.user_id)
+        if past_events:
+            with st.expander(f"🗄️ Past Events ({len(past_events)})"):
+                for past in past_events:
+                    rating = f"⭐ {past['avg_rating']:.1f} ({past['rating_count']})" if past['rating_count'] else "No ratings"
+                    st.write(f"**{past['title']}** • {past['event_date']}")
+                    st.caption(f"👥 {past['registrations']} registered • "
+                              f"✅ {past['attended']} attended • {rating}")
 
 def create_event():
     st.subheader("➕ Create New Event")
@@ -211,23 +315,35 @@ def display_event_card(event, show_register=False, show_status=False, show_manag
             with col_btn1:
                 if event.get('is_registered'):
                     st.success("✅ Registered")
+                elif event['max_participants'] and event['registered_count'] >= event['max_participants']:
+                    # Full: offer the waitlist instead
+                    position = None
+                    if event.get('is_waitlisted'):
+                        position = get_waitlist_position(event['id'], st.session_state.user_id)
+                    if position:
+                        st.info(f"⏳ Waitlist position #{position}")
+                        if st.button("Leave Waitlist", key=f"unwait_{event['id']}",
+                                    use_container_width=True):
+                            leave_waitlist(event['id'], st.session_state.user_id)
+                            st.rerun()
+                    else:
+                        if st.button(f"Join Waitlist ({event['waitlist_count']} waiting)",
+                                    key=f"wait_{event['id']}", use_container_width=True):
+                            success, message = join_waitlist(event['id'], st.session_state.user_id)
+                            if success:
+                                st.success(message)
+                                st.rerun()
+                            else:
+                                st.error(message)
                 else:
-                    conn = get_db_connection()
-                    cursor = conn.cursor()
                     if st.button("Register Now", key=f"reg_{event['id']}", 
                                 use_container_width=True):
-                        try:
-                            cursor.execute('''
-                                INSERT INTO event_registrations (event_id, user_id)
-                                VALUES (?, ?)
-                            ''', (event['id'], st.session_state.user_id))
-                            conn.commit()
-                            st.success("Successfully registered for the event!")
+                        success, message = register_for_event(event['id'], st.session_state.user_id)
+                        if success:
+                            st.success(message)
                             st.rerun()
-                        except Exception as e:
-                            st.error(f"Error: {e}")
-                        finally:
-                            conn.close()
+                        else:
+                            st.error(message)
             with col_btn2:
                 if st.button("View Details", key=f"view_{event['id']}", 
                             use_container_width=True):
@@ -235,15 +351,26 @@ def display_event_card(event, show_register=False, show_status=False, show_manag
         
         elif show_status:
             st.info(f"Status: {event.get('attendance_status', 'registered').title()}")
+            if event.get('checkin_code'):
+                st.caption(f"🎟️ Check-in code: **{event['checkin_code']}**")
+            if st.button("Cancel Registration", key=f"cancel_{event['id']}"):
+                success, _ = cancel_registration(event['id'], st.session_state.user_id)
+                if success:
+                    st.success("Registration cancelled")
+                    st.rerun()
         
         elif show_manage:
-            col_m1, col_m2 = st.columns(2)
+            col_m1, col_m2, col_m3 = st.columns(3)
             with col_m1:
                 if st.button("Manage", key=f"mng_{event['id']}"):
                     manage_event(event['id'])
             with col_m2:
                 if st.button("Participants", key=f"part_{event['id']}"):
                     view_participants(event['id'])
+            with col_m3:
+                if st.button("Check-in", key=f"checkin_{event['id']}"):
+                    st.session_state.checkin_event = event['id']
+                    st.rerun()
         
         st.divider()
 
@@ -277,6 +404,49 @@ def save_event(**kwargs):
 def show_event_details(event_id):
     st.info(f"Detailed view for event {event_id} would open here")
 
+def show_checkin_panel(event_id):
+    """Door check-in mode for an event's organizer"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT title, registered_count FROM events WHERE id = ? AND organizer_id = ?",
+                   (event_id, st.session_state.user_id))
+    event = cursor.fetchone()
+    conn.close()
+    
+    if not event:
+        st.session_state.checkin_event = None
+        st.error("Event not found")
+        return
+    
+    queue = get_checkin_queue()
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        st.subheader(f"🎟️ Check-in: {event['title']}")
+    with col2:
+        if st.button("⬅️ Done", use_container_width=True):
+            queue.forget_event(event_id)
+            st.session_state.checkin_event = None
+            st.rerun()
+    
+    with st.form("checkin_form", clear_on_submit=True):
+        code = st.text_input("Scan or type a check-in code")
+        submitted = st.form_submit_button("Check in", type="primary")
+    
+    if submitted and code:
+        result = queue.scan(event_id, code)
+        if result == 'checked_in':
+            st.success(f"✅ {code.upper()} checked in")
+        elif result == 'duplicate':
+            st.info(f"↩️ {code.upper()} was already checked in")
+        else:
+            st.error(f"❌ {code.upper()} is not registered for this event")
+    
+    attended = queue.attended_count(event_id)
+    st.metric("Checked in", f"{attended} / {event['registered_count']}")
+    if event['registered_count']:
+        st.progress(min(attended / event['registered_count'], 1.0))
+
 def manage_event(event_id):
     st.info(f"Management interface for event {event_id} would open here")
 
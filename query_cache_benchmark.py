@@ -0,0 +1,109 @@
+"""
+Benchmark for the shared query cache's single-flight loading.
+
+Simulates many sessions rerunning the confessions feed at the same
+moment, right after a write invalidated it, with and without
+single-flight. Runs against a freshly seeded database in a scratch
+directory with its own cache, so neither the app database nor the
+process-wide query cache is touched.
+
+Run with:  python query_cache_benchmark.py [sessions] [rounds]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from utils.database import (
+    get_db_connection, init_db, bump_data_version, hash_password, version_bus, VersionedCache
+)
+
+FEED_QUERY = '''
+    SELECT c.*, COALESCE(s.full_name, a.full_name, u.username) as author_name
+    FROM confessions c
+    LEFT JOIN users u ON c.user_id = u.id
+    LEFT JOIN students s ON u.id = s.user_id
+    LEFT JOIN alumni a ON u.id = a.user_id
+    WHERE c.approved_by_admin = 1
+    ORDER BY c.timestamp DESC LIMIT 20
+'''
+FEED_TABLES = ('alumni', 'confessions', 'students', 'users')
+
+
+def seed(num_users=500, num_confessions=5000):
+    """Fill the scratch database with students and approved confessions"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    password = hash_password("benchmark")
+    user_ids = []
+    for i in range(num_users):
+        cursor.execute("INSERT INTO users (username, password, email, role) VALUES (?, ?, ?, 'student')",
+                       (f"bench_student{i}", password, f"bench_student{i}@mes.edu"))
+        user_ids.append(cursor.lastrowid)
+    cursor.executemany("INSERT INTO students (user_id, full_name) VALUES (?, ?)",
+                       ((user_id, f"Student {user_id}") for user_id in user_ids))
+    cursor.executemany('''
+        INSERT INTO confessions (user_id, confession_text, approved_by_admin, timestamp)
+        VALUES (?, ?, 1, datetime('2024-01-01', ? || ' minutes'))
+    ''', ((user_ids[i % num_users], f"Confession {i}", i) for i in range(num_confessions)))
+    conn.commit()
+    conn.close()
+
+
+def load_feed():
+    conn = get_db_connection()
+    try:
+        return conn.execute(FEED_QUERY).fetchall()
+    finally:
+        conn.close()
+
+
+def benchmark_query_coalescing(sessions=200, rounds=5):
+    """
+    Run `rounds` invalidations, each followed by `sessions` threads reading
+    the feed at once. Returns {mode: (database executions, seconds)}.
+    """
+    results = {}
+
+    for single_flight in (False, True):
+        cache = VersionedCache(single_flight=single_flight)
+        started = time.perf_counter()
+
+        for _ in range(rounds):
+            conn = get_db_connection()
+            bump_data_version(conn.cursor(), 'confessions')
+            conn.commit()
+            conn.close()
+
+            barrier = threading.Barrier(sessions)
+
+            def session():
+                barrier.wait()
+                cache.get_or_load(FEED_QUERY, version_bus.versions(*FEED_TABLES), load_feed)
+
+            threads = [threading.Thread(target=session) for _ in range(sessions)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        mode = 'single_flight' if single_flight else 'independent'
+        results[mode] = (cache.stats()['loads'], time.perf_counter() - started)
+
+    return results
+
+
+if __name__ == "__main__":
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with tempfile.TemporaryDirectory(prefix="mes_connect_bench_") as scratch:
+        # The database lives at a relative path, so this gives a fresh one
+        os.chdir(scratch)
+        init_db()
+        seed()
+        for mode, (loads, seconds) in benchmark_query_coalescing(sessions, rounds).items():
+            print(f"{mode:>14}: {loads} database executions for {sessions} sessions x {rounds} rounds "
+                  f"in {seconds:.2f}s")
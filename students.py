@@ -0,0 +1,532 @@
+"""
+Student data access for the admin Student Management page.
+
+Run with:  python students.py --benchmark   (times the streaming export on 100k rows)
+"""
+
+import csv
+import glob
+import importlib.util
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from utils.database import get_db_connection, execute_query, hash_password
+
+STUDENT_PAGE_SIZE = 50
+EXPORT_CHUNK_SIZE = 5000
+
+# Export files waiting to be downloaded; ones older than this were left
+# behind by sessions that ended and are swept
+EXPORT_FILE_PREFIX = "mes_export_"
+EXPORT_FILE_MAX_AGE = 3600
+
+# (column label, SQL expression, pandas dtype) of the admin student table
+STUDENT_COLUMNS = (
+    ('ID', 'u.id', 'int64'),
+    ('Name', 's.full_name', 'string'),
+    ('Username', 'u.username', 'string'),
+    ('Roll No', 's.roll_number', 'string'),
+    ('Batch', 's.batch', 'category'),
+    ('Department', 's.department', 'category'),
+    ('Email', 'u.email', 'string'),
+    ('Joined', 'date(u.created_at)', 'datetime64[ns]'),
+    ('Status', "CASE WHEN u.is_active THEN 'Active' ELSE 'Inactive' END", 'category'),
+)
+
+# sort key -> (ORDER BY, keyset predicate, cursor columns)
+STUDENT_SORTS = {
+    'newest': ('u.created_at DESC, u.id DESC', '(u.created_at, u.id) < (?, ?)',
+               ('u.created_at', 'u.id')),
+    'oldest': ('u.created_at ASC, u.id ASC', '(u.created_at, u.id) > (?, ?)',
+               ('u.created_at', 'u.id')),
+    'name': ('s.full_name ASC, u.id ASC', '(s.full_name, u.id) > (?, ?)',
+             ('s.full_name', 'u.id')),
+}
+
+
+def _student_filters(search=None, department=None, batch=None):
+    """FROM/WHERE clause and params shared by the page, count and export queries"""
+    query = '''
+        FROM users u
+        JOIN students s ON u.id = s.user_id
+        WHERE u.role = 'student'
+    '''
+    params = []
+
+    if search:
+        query += " AND (s.full_name LIKE ? OR s.roll_number LIKE ? OR u.username LIKE ?)"
+        search_term = f"%{search}%"
+        params.extend([search_term, search_term, search_term])
+
+    if department:
+        query += " AND s.department = ?"
+        params.append(department)
+
+    if batch:
+        query += " AND s.batch = ?"
+        params.append(batch)
+
+    return query, params
+
+
+def count_students(search=None, department=None, batch=None):
+    """Number of students matching the filters (shared cached aggregate)"""
+    where, params = _student_filters(search, department, batch)
+    return execute_query(f"SELECT COUNT(*) {where}", tuple(params), fetch_one=True)[0]
+
+
+def list_students_page(search=None, department=None, batch=None, sort='newest',
+                       after=None, page_size=STUDENT_PAGE_SIZE):
+    """
+    Return one page of students as (columns, rows, next_cursor).
+
+    rows are plain tuples in STUDENT_COLUMNS order, ready for a DataFrame.
+    after is the cursor returned by the previous call (None for the first
+    page); next_cursor is None on the last page.
+    """
+    order_by, keyset, cursor_columns = STUDENT_SORTS[sort]
+    where, params = _student_filters(search, department, batch)
+
+    select = ', '.join(f'{expression} AS "{label}"' for label, expression, _ in STUDENT_COLUMNS)
+    query = f"SELECT {select}, {', '.join(cursor_columns)} {where}"
+
+    if after:
+        query += f" AND {keyset}"
+        params.extend(after)
+
+    query += f" ORDER BY {order_by} LIMIT ?"
+    params.append(page_size + 1)
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.row_factory = None
+
+    try:
+        cursor.execute(query, tuple(params))
+        rows = cursor.fetchall()
+    finally:
+        conn.close()
+
+    width = len(STUDENT_COLUMNS)
+    next_cursor = tuple(rows[page_size - 1][width:]) if len(rows) > page_size else None
+    columns = [label for label, _, _ in STUDENT_COLUMNS]
+
+    return columns, [row[:width] for row in rows[:page_size]], next_cursor
+
+
+def get_student(user_id):
+    """Return the student with this user id (STUDENT_COLUMNS labels as keys) or None"""
+    select = ', '.join(f'{expression} AS "{label}"' for label, expression, _ in STUDENT_COLUMNS)
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(f'''
+            SELECT {select}
+            FROM users u
+            JOIN students s ON u.id = s.user_id
+            WHERE u.id = ? AND u.role = 'student'
+        ''', (user_id,))
+        row = cursor.fetchone()
+    finally:
+        conn.close()
+
+    return dict(row) if row else None
+
+
+# kind -> (column name, SQL expression, Arrow type) of the admin exports
+EXPORT_COLUMNS = {
+    'students': (
+        ('id', 'u.id', 'int64'),
+        ('username', 'u.username', 'string'),
+        ('email', 'u.email', 'string'),
+        ('full_name', 's.full_name', 'string'),
+        ('roll_number', 's.roll_number', 'string'),
+        ('batch', 's.batch', 'string'),
+        ('department', 's.department', 'string'),
+        ('semester', 's.semester', 'string'),
+        ('cgpa', 's.cgpa', 'double'),
+        ('contact_number', 's.contact_number', 'string'),
+        ('skills', 's.skills', 'string'),
+        ('interests', 's.interests', 'string'),
+        ('github_url', 's.github_url', 'string'),
+        ('created_at', 'u.created_at', 'string'),
+        ('is_active', 'u.is_active', 'bool'),
+    ),
+    'alumni': (
+        ('id', 'u.id', 'int64'),
+        ('username', 'u.username', 'string'),
+        ('email', 'u.email', 'string'),
+        ('full_name', 'a.full_name', 'string'),
+        ('graduation_year', 'a.graduation_year', 'int64'),
+        ('current_position', 'a.current_position', 'string'),
+        ('company', 'a.company', 'string'),
+        ('industry', 'a.industry', 'string'),
+        ('experience_years', 'a.experience_years', 'int64'),
+        ('linkedin_url', 'a.linkedin_url', 'string'),
+        ('expertise_area', 'a.expertise_area', 'string'),
+        ('is_mentor', 'a.is_mentor', 'bool'),
+        ('available_for_mentorship', 'a.available_for_mentorship', 'bool'),
+        ('created_at', 'u.created_at', 'string'),
+        ('is_active', 'u.is_active', 'bool'),
+    ),
+}
+
+
+def parquet_available():
+    """Parquet export needs the optional pyarrow package"""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _export_query(kind, search=None, department=None, batch=None):
+    select = ', '.join(expression for _, expression, _ in EXPORT_COLUMNS[kind])
+
+    if kind == 'students':
+        where, params = _student_filters(search, department, batch)
+    else:
+        where, params = '''
+            FROM users u
+            JOIN alumni a ON u.id = a.user_id
+            WHERE u.role = 'alumni'
+        ''', []
+
+    return f"SELECT {select} {where} ORDER BY u.id", params
+
+
+def _export_chunks(cursor, query, params, chunk_size):
+    """Yield the result in lists of at most chunk_size tuples"""
+    cursor.row_factory = None
+    cursor.execute(query, tuple(params))
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        yield rows
+
+
+def _write_csv(fileobj, columns, chunks):
+    written = 0
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _, _ in columns])
+
+    for rows in chunks:
+        writer.writerows(rows)
+        fileobj.write(buffer.getvalue().encode('utf-8'))
+        buffer.seek(0)
+        buffer.truncate()
+        written += len(rows)
+
+    fileobj.write(buffer.getvalue().encode('utf-8'))
+    return written
+
+
+def _numeric(value, convert):
+    """Number for an Arrow numeric column; None for '' and other non-numbers"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    try:
+        return convert(value)
+    except ValueError:
+        return None
+
+
+def _write_parquet(fileobj, columns, chunks):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    def arrow_type(name):
+        return pa.bool_() if name == 'bool' else pa.type_for_alias(name)
+
+    schema = pa.schema([(name, arrow_type(type_name)) for name, _, type_name in columns])
+    written = 0
+
+    # One row group per chunk, so only one chunk is ever held as Arrow arrays
+    with pq.ParquetWriter(fileobj, schema) as writer:
+        for rows in chunks:
+            arrays = []
+            for index, (_, _, type_name) in enumerate(columns):
+                values = [row[index] for row in rows]
+                if type_name == 'string':
+                    arrays.append(pa.array(values, type=pa.string()))
+                elif type_name == 'double':
+                    arrays.append(pa.array([_numeric(value, float) for value in values],
+                                           type=pa.float64()))
+                else:
+                    # Forms store '' for empty numbers; SQLite stores booleans as 0/1
+                    numbers = pa.array([_numeric(value, int) for value in values], type=pa.int64())
+                    arrays.append(numbers.cast(pa.bool_()) if type_name == 'bool' else numbers)
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            written += len(rows)
+
+    return written
+
+
+def export_people(fileobj, kind='students', fmt='csv', search=None, department=None,
+                  batch=None, chunk_size=EXPORT_CHUNK_SIZE, cursor=None):
+    """
+    Stream students or alumni into a binary file object as CSV or Parquet.
+
+    Rows are read with fetchmany in chunks of chunk_size and written as they
+    arrive, so memory stays bounded whatever the table size. Student exports
+    honour the same filters as the admin table. Returns the rows written.
+    """
+    if kind not in EXPORT_COLUMNS:
+        raise ValueError(f"Unknown export kind: {kind}")
+    if fmt not in ('csv', 'parquet'):
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    conn = None
+    if cursor is None:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+    try:
+        query, params = _export_query(kind, search, department, batch)
+        chunks = _export_chunks(cursor, query, params, chunk_size)
+        write = _write_csv if fmt == 'csv' else _write_parquet
+        return write(fileobj, EXPORT_COLUMNS[kind], chunks)
+    finally:
+        if conn:
+            conn.close()
+
+
+def export_to_file(kind='students', fmt='csv', **filters):
+    """
+    Export into a new temp file for download; returns (path, rows written).
+
+    A failed export removes its partial file. The caller removes the file
+    with remove_export_file once it is no longer offered for download.
+    """
+    output = tempfile.NamedTemporaryFile(prefix=EXPORT_FILE_PREFIX, suffix=f".{fmt}", delete=False)
+    try:
+        with output:
+            written = export_people(output, kind, fmt, **filters)
+    except BaseException:
+        remove_export_file(output.name)
+        raise
+    return output.name, written
+
+
+def remove_export_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def sweep_export_files(max_age=EXPORT_FILE_MAX_AGE):
+    """Delete export files older than max_age seconds; returns how many were removed"""
+    cutoff = time.time() - max_age
+    removed = 0
+    for path in glob.glob(os.path.join(tempfile.gettempdir(), EXPORT_FILE_PREFIX + "*")):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            # Already removed by another session or worker
+            pass
+    return removed
+
+
+IMPORT_CHUNK_SIZE = 500
+IMPORT_COLUMNS = ('username', 'password', 'email', 'full_name', 'roll_number',
+                  'batch', 'department', 'contact_number')
+IMPORT_REQUIRED = IMPORT_COLUMNS[:-1]
+
+# column -> (table holding it, label used in error messages)
+IMPORT_UNIQUE = {
+    'username': ('users', 'Username'),
+    'email': ('users', 'Email'),
+    'roll_number': ('students', 'Roll number'),
+}
+
+
+def _validate_import_row(row, seen):
+    """Return an error message for the row, or None if it can be imported"""
+    missing = [column for column in IMPORT_REQUIRED if not row.get(column)]
+    if missing:
+        return f"Missing {', '.join(missing)}"
+
+    if '@' not in row['email']:
+        return f"Invalid email: {row['email']}"
+
+    for column, (_, label) in IMPORT_UNIQUE.items():
+        if row[column] in seen[column]:
+            return f"{label} repeated in the file: {row[column]}"
+
+    for column in IMPORT_UNIQUE:
+        seen[column].add(row[column])
+    return None
+
+
+def _insert_students(cursor, rows):
+    cursor.executemany('''
+        INSERT INTO users (username, password, email, role)
+        VALUES (?, ?, ?, 'student')
+    ''', [(row['username'], hash_password(row['password']), row['email']) for row in rows])
+
+    # executemany has no lastrowid per row, so map the new ids back by username
+    placeholders = ', '.join(['?'] * len(rows))
+    cursor.execute(f"SELECT id, username FROM users WHERE username IN ({placeholders})",
+                   tuple(row['username'] for row in rows))
+    user_ids = {username: user_id for user_id, username in cursor.fetchall()}
+
+    cursor.executemany('''
+        INSERT INTO students (user_id, full_name, batch, department, roll_number, contact_number)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', [(user_ids[row['username']], row['full_name'], row['batch'], row['department'],
+           row['roll_number'], row.get('contact_number', '')) for row in rows])
+
+
+def _import_chunk(cursor, chunk, result):
+    """Insert one chunk of validated (line, row) pairs in a single transaction"""
+    # Rows clashing with existing accounts are reported, not inserted
+    taken = {}
+    placeholders = ', '.join(['?'] * len(chunk))
+    for column, (table, _) in IMPORT_UNIQUE.items():
+        cursor.execute(f"SELECT {column} FROM {table} WHERE {column} IN ({placeholders})",
+                       tuple(row[column] for _, row in chunk))
+        taken[column] = {value for value, in cursor.fetchall()}
+
+    accepted = []
+    for line, row in chunk:
+        clash = next((column for column in IMPORT_UNIQUE if row[column] in taken[column]), None)
+        if clash:
+            result['errors'].append((line, f"{IMPORT_UNIQUE[clash][1]} already exists: {row[clash]}"))
+        else:
+            accepted.append((line, row))
+
+    if not accepted:
+        return
+
+    try:
+        _insert_students(cursor, [row for _, row in accepted])
+        cursor.connection.commit()
+        result['imported'] += len(accepted)
+    except sqlite3.IntegrityError:
+        # A value was taken after the check (e.g. a concurrent sign-up):
+        # retry the chunk row by row so only the conflicting rows are rejected.
+        # The savepoints nest in one explicit transaction; on their own, each
+        # RELEASE would commit its row separately
+        cursor.connection.rollback()
+        cursor.execute("BEGIN")
+        for line, row in accepted:
+            cursor.execute("SAVEPOINT import_row")
+            try:
+                _insert_students(cursor, [row])
+                cursor.execute("RELEASE import_row")
+                result['imported'] += 1
+            except sqlite3.IntegrityError as e:
+                cursor.execute("ROLLBACK TO import_row")
+                cursor.execute("RELEASE import_row")
+                result['errors'].append((line, str(e)))
+        cursor.connection.commit()
+
+
+def import_students_csv(textfile, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Bulk-create student accounts from a CSV text stream.
+
+    The header must contain IMPORT_REQUIRED (contact_number is optional).
+    Rows are validated as they are read and inserted with executemany, one
+    transaction per chunk_size rows. Invalid rows and rows whose username,
+    email or roll number is already taken are reported and skipped; the rest
+    of the file is still imported. Returns {'imported', 'errors'} where
+    errors is a list of (CSV line number, message).
+    """
+    reader = csv.DictReader(textfile)
+    header = {name.strip().lower() for name in reader.fieldnames or [] if name}
+    missing = [column for column in IMPORT_REQUIRED if column not in header]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    result = {'imported': 0, 'errors': []}
+    seen = {column: set() for column in IMPORT_UNIQUE}
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.row_factory = None
+
+    try:
+        chunk = []
+        for raw in reader:
+            # Physical line, so quoted fields spanning lines don't shift it
+            line = reader.line_num
+            row = {key.strip().lower(): (value or '').strip()
+                   for key, value in raw.items() if key}
+
+            error = _validate_import_row(row, seen)
+            if error:
+                result['errors'].append((line, error))
+                continue
+
+            chunk.append((line, row))
+            if len(chunk) >= chunk_size:
+                _import_chunk(cursor, chunk, result)
+                chunk = []
+
+        if chunk:
+            _import_chunk(cursor, chunk, result)
+    finally:
+        conn.close()
+
+    result['errors'].sort()
+    return result
+
+
+def benchmark_export(rows=100000, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Export synthetic students from a scratch database, streaming and in a
+    single fetch for comparison. Returns {mode: (seconds, peak MiB, bytes)}.
+    """
+    conn = sqlite3.connect(":memory:")
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT, email TEXT, role TEXT,
+                            created_at TEXT, is_active INTEGER)
+    ''')
+    cursor.execute('''
+        CREATE TABLE students (user_id INTEGER, full_name TEXT, roll_number TEXT, batch TEXT,
+                               department TEXT, semester TEXT, cgpa REAL, contact_number TEXT,
+                               skills TEXT, interests TEXT, github_url TEXT)
+    ''')
+    cursor.executemany("INSERT INTO users VALUES (?, ?, ?, 'student', '2024-06-01 10:00:00', 1)",
+                       ((i, f"student{i}", f"student{i}@mes.edu") for i in range(1, rows + 1)))
+    cursor.executemany('''
+        INSERT INTO students VALUES (?, ?, ?, '2022-2026', 'Computer Science', '5', 8.1,
+                                     '9876543210', 'python, sql', 'ml, web', NULL)
+    ''', ((i, f"Student {i}", f"MES{i:06d}") for i in range(1, rows + 1)))
+    conn.commit()
+
+    modes = [('single fetch csv', rows, 'csv'), ('streaming csv', chunk_size, 'csv')]
+    if parquet_available():
+        modes.append(('streaming parquet', chunk_size, 'parquet'))
+
+    results = {}
+    for mode, size, fmt in modes:
+        with tempfile.TemporaryFile() as output:
+            tracemalloc.start()
+            started = time.perf_counter()
+            export_people(output, 'students', fmt, chunk_size=size, cursor=conn.cursor())
+            seconds = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+            results[mode] = (seconds, peak, output.tell())
+
+    conn.close()
+    return results
+
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        for mode, (seconds, peak, size) in benchmark_export().items():
+            print(f"{mode:>17}: 100000 rows, {size / (1024 * 1024):.1f} MiB in {seconds:.2f}s, "
+                  f"peak {peak:.1f} MiB")
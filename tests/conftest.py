@@ -0,0 +1,23 @@
+"""
+The app imports its modules as utils.<name> (utils.database, utils.events,
+...). Map that package onto the repository root and run every test in a
+scratch directory, so data/mes_connect.db is a fresh database.
+"""
+
+import os
+import sys
+import tempfile
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if 'utils' not in sys.modules:
+    utils = types.ModuleType('utils')
+    utils.__path__ = [ROOT]
+    sys.modules['utils'] = utils
+
+os.chdir(tempfile.mkdtemp(prefix="mes_connect_tests_"))
+
+from utils.database import init_db  # noqa: E402
+
+init_db()
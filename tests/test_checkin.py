@@ -0,0 +1,99 @@
+import logging
+import threading
+import time
+
+from utils import checkin
+from utils.checkin import CheckInQueue
+from utils.database import get_db_connection
+
+
+def _event_with_registrations(prefix, count):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO users (username, password, email, role) VALUES (?, 'x', ?, 'admin')",
+                   (f"{prefix}_organizer", f"{prefix}_organizer@mes.edu"))
+    organizer = cursor.lastrowid
+    cursor.execute("INSERT INTO events (title, organizer_id, event_date, event_time) "
+                   "VALUES ('Check-in test', ?, '2026-01-01', '10:00')", (organizer,))
+    event_id = cursor.lastrowid
+
+    registrations = []
+    for i in range(count):
+        cursor.execute("INSERT INTO users (username, password, email, role) VALUES (?, 'x', ?, 'student')",
+                       (f"{prefix}_{i}", f"{prefix}_{i}@mes.edu"))
+        cursor.execute("INSERT INTO event_registrations (event_id, user_id) VALUES (?, ?)",
+                       (event_id, cursor.lastrowid))
+        registrations.append(cursor.lastrowid)
+    conn.commit()
+    conn.close()
+    return event_id, registrations
+
+
+def _attended_count(event_id):
+    conn = get_db_connection()
+    count = conn.execute("SELECT attended_count FROM events WHERE id = ?", (event_id,)).fetchone()[0]
+    conn.close()
+    return count
+
+
+def test_codes_are_unique_and_null_status_keeps_count_in_sync():
+    event_id, registrations = _event_with_registrations('chk_codes', 50)
+
+    conn = get_db_connection()
+    codes = [row[0] for row in conn.execute(
+        "SELECT checkin_code FROM event_registrations WHERE event_id = ?", (event_id,))]
+    assert len(set(codes)) == len(registrations)
+
+    # NULL -> attended -> NULL must count up and back down
+    conn.execute("UPDATE event_registrations SET attendance_status = NULL WHERE id = ?", (registrations[0],))
+    conn.execute("UPDATE event_registrations SET attendance_status = 'attended' WHERE id = ?", (registrations[0],))
+    conn.commit()
+    assert _attended_count(event_id) == 1
+    conn.execute("UPDATE event_registrations SET attendance_status = NULL WHERE id = ?", (registrations[0],))
+    conn.commit()
+    conn.close()
+    assert _attended_count(event_id) == 0
+
+
+def test_scan_checks_in_registration_with_null_status():
+    event_id, registrations = _event_with_registrations('chk_scan', 2)
+
+    conn = get_db_connection()
+    conn.execute("UPDATE event_registrations SET attendance_status = NULL WHERE id = ?", (registrations[1],))
+    code = conn.execute("SELECT checkin_code FROM event_registrations WHERE id = ?",
+                        (registrations[1],)).fetchone()[0]
+    conn.commit()
+    conn.close()
+
+    queue = CheckInQueue()
+    assert queue.scan(event_id, code.lower()) == 'checked_in'
+    assert queue.scan(event_id, code) == 'duplicate'
+    assert queue.scan(event_id, 'NOT-A-CODE') == 'unknown'
+    assert queue.attended_count(event_id) == 1
+
+    assert queue.flush() == 1
+    assert _attended_count(event_id) == 1
+    assert queue.attended_count(event_id) == 1
+
+
+def test_failed_background_flush_is_logged_with_traceback(caplog):
+    queue = CheckInQueue(flush_interval=0.01)
+    failed = threading.Event()
+
+    def failing_flush():
+        if failed.is_set():
+            return 0
+        failed.set()
+        raise RuntimeError("database is locked")
+
+    queue.flush = failing_flush
+    with caplog.at_level(logging.ERROR, logger=checkin.logger.name):
+        queue._ensure_thread()
+        assert failed.wait(5)
+        deadline = time.monotonic() + 5
+        while not caplog.records and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    record = caplog.records[0]
+    assert "Check-in flush failed" in record.getMessage()
+    assert record.exc_info and record.exc_info[0] is RuntimeError
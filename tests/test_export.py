@@ -0,0 +1,80 @@
+import csv
+import io
+import os
+import tempfile
+import time
+
+import pytest
+
+from utils import students
+from utils.database import get_db_connection
+from utils.students import export_people, export_to_file, remove_export_file, sweep_export_files
+
+
+def _add_alumni(username, graduation_year, experience_years):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO users (username, password, email, role) VALUES (?, 'x', ?, 'alumni')",
+                   (username, f"{username}@mes.edu"))
+    # register_user stores '' for fields left empty on the sign-up form
+    cursor.execute('''
+        INSERT INTO alumni (user_id, full_name, graduation_year, experience_years)
+        VALUES (?, ?, ?, ?)
+    ''', (cursor.lastrowid, username, graduation_year, experience_years))
+    conn.commit()
+    conn.close()
+
+
+def test_csv_export_streams_every_row():
+    _add_alumni("export_csv_1", 2020, 3)
+    _add_alumni("export_csv_2", '', '')
+
+    output = io.BytesIO()
+    written = export_people(output, 'alumni', 'csv', chunk_size=1)
+
+    rows = list(csv.DictReader(io.StringIO(output.getvalue().decode('utf-8'))))
+    assert written == len(rows)
+    assert {'export_csv_1', 'export_csv_2'} <= {row['username'] for row in rows}
+
+
+def test_parquet_export_handles_empty_numeric_fields():
+    pq = pytest.importorskip("pyarrow.parquet")
+    _add_alumni("export_parquet_1", 2019, 5)
+    _add_alumni("export_parquet_2", '', '')
+
+    output = io.BytesIO()
+    written = export_people(output, 'alumni', 'parquet', chunk_size=1)
+
+    table = pq.read_table(io.BytesIO(output.getvalue()))
+    assert table.num_rows == written
+    rows = {row['username']: row for row in table.to_pylist()}
+    assert rows['export_parquet_1']['graduation_year'] == 2019
+    assert rows['export_parquet_2']['graduation_year'] is None
+    assert rows['export_parquet_2']['experience_years'] is None
+    assert rows['export_parquet_2']['is_mentor'] is False
+
+
+def test_export_files_are_removed_on_failure_and_swept_when_stale(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+
+    def failing_export(fileobj, *args, **kwargs):
+        fileobj.write(b"partial")
+        raise RuntimeError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(students, 'export_people', failing_export)
+        with pytest.raises(RuntimeError):
+            export_to_file('alumni', 'csv')
+    assert list(tmp_path.iterdir()) == []
+
+    stale, written = export_to_file('alumni', 'csv')
+    fresh, _ = export_to_file('alumni', 'csv')
+    assert written > 0
+    old = time.time() - students.EXPORT_FILE_MAX_AGE - 60
+    os.utime(stale, (old, old))
+
+    assert sweep_export_files() == 1
+    assert not os.path.exists(stale) and os.path.exists(fresh)
+    remove_export_file(fresh)
+    remove_export_file(fresh)
+    assert list(tmp_path.iterdir()) == []
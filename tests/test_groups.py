@@ -0,0 +1,65 @@
+from utils.analytics import run_group_recommendations
+from utils.database import get_db_connection
+from utils.groups import get_recommended_groups, join_group
+
+
+def _setup():
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    users = []
+    for name in ("grp_it_student", "grp_cs_student"):
+        cursor.execute("INSERT INTO users (username, password, email, role) VALUES (?, 'x', ?, 'student')",
+                       (name, f"{name}@mes.edu"))
+        users.append(cursor.lastrowid)
+    cursor.execute("INSERT INTO students (user_id, full_name, department) VALUES (?, 'IT', 'IT')",
+                   (users[0],))
+    cursor.execute("INSERT INTO students (user_id, full_name, department) VALUES (?, 'CS', 'CS')",
+                   (users[1],))
+
+    cursor.execute('''
+        INSERT INTO groups (name, creator_id, group_type, is_public, cohort_value)
+        VALUES ('CS Department', ?, 'department', 1, 'CS')
+    ''', (users[1],))
+    cohort_id = cursor.lastrowid
+    cursor.execute('''
+        INSERT INTO groups (name, creator_id, group_type, is_public)
+        VALUES ('Algorithms', ?, 'study', 1)
+    ''', (users[1],))
+    study_id = cursor.lastrowid
+    cursor.execute("INSERT INTO group_members (group_id, user_id) VALUES (?, ?)", (cohort_id, users[1]))
+    cursor.execute("INSERT INTO group_members (group_id, user_id) VALUES (?, ?)", (study_id, users[1]))
+    conn.commit()
+    conn.close()
+    return users, cohort_id, study_id
+
+
+def test_cohort_groups_are_never_recommended_or_joinable():
+    (it_student, _), cohort_id, study_id = _setup()
+
+    fallback = [group['id'] for group in get_recommended_groups(it_student, limit=50)]
+    assert cohort_id not in fallback
+
+    run_group_recommendations()
+    batch = [group['id'] for group in get_recommended_groups(it_student, limit=50)]
+    assert cohort_id not in batch
+
+    assert not join_group(cohort_id, it_student)
+    assert join_group(study_id, it_student)
+    assert not join_group(study_id, it_student)
+
+
+def test_banned_users_cannot_rejoin():
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO users (username, password, email, role) "
+                   "VALUES ('grp_banned', 'x', 'grp_banned@mes.edu', 'student')")
+    user_id = cursor.lastrowid
+    cursor.execute("INSERT INTO groups (name, creator_id, group_type, is_public) "
+                   "VALUES ('Banned Study', ?, 'study', 1)", (user_id,))
+    group_id = cursor.lastrowid
+    cursor.execute("INSERT INTO group_members (group_id, user_id, is_banned) VALUES (?, ?, 1)",
+                   (group_id, user_id))
+    conn.commit()
+    conn.close()
+
+    assert not join_group(group_id, user_id)
@@ -0,0 +1,60 @@
+import io
+
+from utils import students
+from utils.database import get_db_connection
+from utils.students import import_students_csv
+
+HEADER = "username,password,email,full_name,batch,department,roll_number\n"
+
+
+def test_error_lines_follow_quoted_newlines():
+    csv_text = (HEADER
+                + 'imp_ok_1,pw,imp_ok_1@mes.edu,"Multi\nLine",2022-2026,IT,IMP001\n'
+                + "imp_bad,pw,not-an-email,Bad,2022-2026,IT,IMP002\n")
+
+    result = import_students_csv(io.StringIO(csv_text))
+
+    assert result['imported'] == 1
+    assert result['errors'] == [(4, "Invalid email: not-an-email")]
+
+
+def test_row_by_row_fallback_runs_in_one_transaction(monkeypatch):
+    conn = get_db_connection()
+    conn.execute('''
+        CREATE TRIGGER trg_test_reject_roll BEFORE INSERT ON students
+        WHEN NEW.roll_number = 'IMP_REJECT'
+        BEGIN SELECT RAISE(ABORT, 'rejected roll number'); END
+    ''')
+    conn.commit()
+    conn.close()
+
+    savepoints_in_transaction = []
+
+    def traced_connection():
+        traced = get_db_connection()
+        traced.set_trace_callback(lambda sql: sql.startswith("SAVEPOINT") and
+                                  savepoints_in_transaction.append(traced.in_transaction))
+        return traced
+
+    monkeypatch.setattr(students, 'get_db_connection', traced_connection)
+
+    csv_text = (HEADER
+                + "imp_fb_1,pw,imp_fb_1@mes.edu,One,2022-2026,IT,IMP101\n"
+                + "imp_fb_2,pw,imp_fb_2@mes.edu,Two,2022-2026,IT,IMP_REJECT\n"
+                + "imp_fb_3,pw,imp_fb_3@mes.edu,Three,2022-2026,IT,IMP103\n")
+    try:
+        result = import_students_csv(io.StringIO(csv_text))
+    finally:
+        conn = get_db_connection()
+        conn.execute("DROP TRIGGER trg_test_reject_roll")
+        conn.commit()
+        conn.close()
+
+    assert result['imported'] == 2
+    assert [line for line, _ in result['errors']] == [3]
+    assert savepoints_in_transaction == [True, True, True]
+
+    conn = get_db_connection()
+    usernames = {row[0] for row in conn.execute("SELECT username FROM users WHERE username LIKE 'imp_fb_%'")}
+    conn.close()
+    assert usernames == {'imp_fb_1', 'imp_fb_3'}
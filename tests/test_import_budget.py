@@ -0,0 +1,30 @@
+import os
+
+import pytest
+
+pytest.importorskip("streamlit")
+
+from utils import import_budget  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def probe_env(tmp_path, monkeypatch):
+    """Run the probes from the repository root with utils importable, as the app is"""
+    os.symlink(ROOT, tmp_path / "utils")
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join(
+        filter(None, [str(tmp_path), os.environ.get("PYTHONPATH")])))
+    monkeypatch.chdir(ROOT)
+
+
+def test_student_entry_points_stay_within_import_budget(probe_env):
+    targets = import_budget.default_targets()
+    assert "app" in targets and len(targets) > 1
+
+    for target in targets:
+        report = import_budget.profile_import(target)
+        assert report['error'] is None, f"{target}: {report['error']}"
+        assert not report['heavy'], f"{target} imports admin-only packages: {report['heavy']}"
+        assert report['total_ms'] <= import_budget.IMPORT_BUDGET_MS, (
+            f"{target}: {report['total_ms']:.0f} ms, slowest {report['slowest']}")
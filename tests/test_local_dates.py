@@ -0,0 +1,101 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from utils.database import get_dashboard_snapshot, get_db_connection, local_today
+from utils.events import (archive_past_events, recommended_events, register_for_event,
+                          upcoming_events_page)
+
+
+@pytest.fixture
+def local_date_differs_from_utc(monkeypatch):
+    """Switch to a timezone whose date is not the UTC date right now"""
+    # UTC-12 is a day behind until noon UTC, UTC+14 a day ahead from 10:00 UTC
+    zone = 'Etc/GMT+12' if datetime.now(timezone.utc).hour < 12 else 'Etc/GMT-14'
+    monkeypatch.setenv('TZ', zone)
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def _add_event(title, event_date):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO users (username, password, email, role) VALUES (?, 'x', ?, 'student')",
+                   (title, f"{title}@mes.edu"))
+    user_id = cursor.lastrowid
+    cursor.execute("INSERT INTO events (title, organizer_id, event_date, event_time) VALUES (?, ?, ?, '23:59')",
+                   (title, user_id, event_date))
+    event_id = cursor.lastrowid
+    conn.commit()
+    conn.close()
+    return user_id, event_id
+
+
+def test_upcoming_events_follow_the_local_date(local_date_differs_from_utc):
+    today = local_today()
+    assert today != datetime.now(timezone.utc).date()
+    _, today_id = _add_event("local_today_upcoming", today.isoformat())
+    _, yesterday_id = _add_event("local_yesterday_upcoming", (today - timedelta(days=1)).isoformat())
+
+    page, _ = upcoming_events_page(0, window_days=7, page_size=500)
+    listed = [event['id'] for event in page]
+    assert today_id in listed
+    assert yesterday_id not in listed
+
+
+def test_recommendations_follow_the_local_date(local_date_differs_from_utc):
+    today = local_today()
+    _, today_id = _add_event("local_today_for_you", today.isoformat())
+    _, yesterday_id = _add_event("local_yesterday_for_you", (today - timedelta(days=1)).isoformat())
+    viewer, _ = _add_event("local_for_you_viewer", "2000-01-01")
+
+    recommended = [event['id'] for event in recommended_events(viewer, limit=500)]
+    assert today_id in recommended
+    assert yesterday_id not in recommended
+
+
+def test_events_are_not_archived_while_still_today_locally(local_date_differs_from_utc):
+    today = local_today()
+    _, today_id = _add_event("local_today_archive", today.isoformat())
+    _, yesterday_id = _add_event("local_yesterday_archive", (today - timedelta(days=1)).isoformat())
+
+    archive_past_events(older_than_days=0)
+
+    conn = get_db_connection()
+    live = {row[0] for row in conn.execute("SELECT id FROM events WHERE id IN (?, ?)",
+                                           (today_id, yesterday_id))}
+    conn.close()
+    assert live == {today_id}
+
+
+def test_dashboard_counts_todays_local_events(local_date_differs_from_utc):
+    today = local_today()
+    user_id, today_id = _add_event("local_today_snapshot", today.isoformat())
+    _, yesterday_id = _add_event("local_yesterday_snapshot", (today - timedelta(days=1)).isoformat())
+
+    conn = get_db_connection()
+    conn.executemany("INSERT INTO event_registrations (event_id, user_id) VALUES (?, ?)",
+                     [(today_id, user_id), (yesterday_id, user_id)])
+    conn.commit()
+    conn.close()
+
+    assert get_dashboard_snapshot(user_id)['upcoming_events'] == 1
+
+
+def test_registration_deadline_follows_the_local_date(local_date_differs_from_utc):
+    today = local_today()
+    user_id, open_id = _add_event("local_deadline_open", "2099-01-01")
+    _, closed_id = _add_event("local_deadline_closed", "2099-01-01")
+
+    conn = get_db_connection()
+    conn.execute("UPDATE events SET registration_deadline = ? WHERE id = ?", (today.isoformat(), open_id))
+    conn.execute("UPDATE events SET registration_deadline = ? WHERE id = ?",
+                 ((today - timedelta(days=1)).isoformat(), closed_id))
+    conn.commit()
+    conn.close()
+
+    assert register_for_event(open_id, user_id)[0]
+    assert register_for_event(closed_id, user_id) == (False, "Registration for this event has closed")
@@ -0,0 +1,36 @@
+import os
+
+import pytest
+
+from utils.page_registry import PageNotFoundError, PageRegistry
+
+
+@pytest.fixture
+def role_pages(monkeypatch):
+    os.makedirs("regpages/Role", exist_ok=True)
+    with open("regpages/Role/good.py", "w") as f:
+        f.write("def show():\n    return 'shown'\n")
+    with open("regpages/Role/broken.py", "w") as f:
+        f.write("def show(:\n")
+    monkeypatch.syspath_prepend(os.getcwd())
+
+    return {'role': [
+        ("Good", None, "regpages/Role/good.py"),
+        ("Broken", None, "regpages/Role/broken.py"),
+        ("Missing", None, "regpages/Role/missing.py"),
+    ]}
+
+
+def test_unloadable_pages_are_left_out_of_the_menu(role_pages):
+    registry = PageRegistry(role_pages)
+
+    assert registry.labels('role') == ["Good"]
+    assert [label for _, label, _, _ in registry.unavailable] == ["Broken", "Missing"]
+    assert registry.load('role', "Good").show() == 'shown'
+    with pytest.raises(PageNotFoundError):
+        registry.load('role', "Broken")
+
+
+def test_strict_registry_fails_at_boot(role_pages):
+    with pytest.raises(PageNotFoundError):
+        PageRegistry(role_pages, strict=True)
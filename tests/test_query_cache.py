@@ -0,0 +1,61 @@
+from utils.database import execute_query, get_db_connection, _query_tables
+
+
+def _add_student(username, department):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO users (username, password, email, role) VALUES (?, 'x', ?, 'student')",
+                   (username, f"{username}@mes.edu"))
+    cursor.execute("INSERT INTO students (user_id, full_name, department) VALUES (?, ?, ?)",
+                   (cursor.lastrowid, username, department))
+    conn.commit()
+    conn.close()
+
+
+def test_query_tables_sees_comma_joins_and_subqueries():
+    assert _query_tables("SELECT COUNT(*) FROM users u, students s WHERE u.id = s.user_id") \
+        == {'users', 'students'}
+    assert _query_tables("SELECT * FROM users WHERE id IN (SELECT sender_id FROM group_messages)") \
+        == {'users', 'group_messages'}
+
+
+def test_comma_join_result_is_invalidated_by_the_second_table():
+    _add_student("comma_join_civil", "Civil")
+    _add_student("comma_join_mech", "Mechanical")
+
+    query = '''
+        SELECT COUNT(*) FROM users u, students s
+        WHERE u.id = s.user_id AND s.department = 'Civil'
+    '''
+    before = execute_query(query, fetch_one=True)[0]
+    assert execute_query(query, fetch_one=True)[0] == before
+
+    # Only students changes; users is untouched
+    conn = get_db_connection()
+    conn.execute("UPDATE students SET department = 'Civil' WHERE full_name = 'comma_join_mech'")
+    conn.commit()
+    conn.close()
+
+    assert execute_query(query, fetch_one=True)[0] == before + 1
+
+
+def test_login_does_not_invalidate_user_queries():
+    from utils.database import version_bus
+
+    _add_student("login_churn", "Civil")
+    conn = get_db_connection()
+    user_id = conn.execute("SELECT id FROM users WHERE username = 'login_churn'").fetchone()[0]
+    conn.close()
+    before = version_bus.version('users')
+
+    conn = get_db_connection()
+    conn.execute("UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = ?", (user_id,))
+    conn.commit()
+    conn.close()
+    assert version_bus.version('users') == before
+
+    conn = get_db_connection()
+    conn.execute("UPDATE users SET bio = 'hello' WHERE id = ?", (user_id,))
+    conn.commit()
+    conn.close()
+    assert version_bus.version('users') == before + 1
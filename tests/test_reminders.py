@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+
+from utils.database import get_db_connection, init_db
+from utils.events import get_upcoming_reminders
+
+
+def test_old_reminders_table_is_rebuilt_with_not_null_kind():
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO users (username, password, email, role) "
+                   "VALUES ('rem_student', 'x', 'rem_student@mes.edu', 'student')")
+    user_id = cursor.lastrowid
+    # Starts later today in local time, so a UTC comparison could hide it
+    start = datetime.now() + timedelta(minutes=5)
+    cursor.execute("INSERT INTO events (title, organizer_id, event_date, event_time) VALUES ('Soon', ?, ?, ?)",
+                   (user_id, start.strftime("%Y-%m-%d"), start.strftime("%H:%M:%S")))
+    cursor.execute("INSERT INTO event_registrations (event_id, user_id) VALUES (?, ?)",
+                   (cursor.lastrowid, user_id))
+
+    # Recreate the table as it was before kind became NOT NULL
+    cursor.execute("DROP TABLE event_reminders")
+    cursor.execute('''
+        CREATE TABLE event_reminders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            event_id INTEGER NOT NULL,
+            kind TEXT CHECK(kind IN ('event', 'deadline')),
+            due_at TEXT NOT NULL,
+            UNIQUE(user_id, event_id, kind)
+        )
+    ''')
+    conn.commit()
+    conn.close()
+
+    init_db()
+
+    conn = get_db_connection()
+    sql = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'event_reminders'").fetchone()[0]
+    conn.close()
+    assert "kind TEXT NOT NULL" in sql
+
+    reminders = get_upcoming_reminders(user_id)
+    assert [(r['kind'], r['title']) for r in reminders] == [('event', 'Soon')]
@@ -0,0 +1,51 @@
+from utils.database import get_db_connection
+from utils.events import (cancel_registration, get_waitlist_position, join_waitlist, leave_waitlist,
+                          register_for_event)
+
+
+def _full_event(prefix, queued):
+    """A one-seat event that is taken, plus `queued` users who can queue"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    users = []
+    for i in range(queued + 1):
+        cursor.execute("INSERT INTO users (username, password, email, role) VALUES (?, 'x', ?, 'student')",
+                       (f"{prefix}_{i}", f"{prefix}_{i}@mes.edu"))
+        users.append(cursor.lastrowid)
+    cursor.execute('''
+        INSERT INTO events (title, organizer_id, event_date, event_time, max_participants)
+        VALUES ('Waitlist test', ?, '2099-01-01', '10:00', 1)
+    ''', (users[0],))
+    event_id = cursor.lastrowid
+    conn.commit()
+    conn.close()
+
+    assert register_for_event(event_id, users[0])[0]
+    return event_id, users[0], users[1:]
+
+
+def test_positions_stay_exact_as_users_leave_and_get_promoted():
+    event_id, attendee, queue = _full_event('wl_pos', 4)
+    for user_id in queue:
+        assert join_waitlist(event_id, user_id)[0]
+    assert [get_waitlist_position(event_id, u) for u in queue] == [1, 2, 3, 4]
+
+    leave_waitlist(event_id, queue[1])
+    assert get_waitlist_position(event_id, queue[1]) is None
+    assert [get_waitlist_position(event_id, u) for u in (queue[0], queue[2], queue[3])] == [1, 2, 3]
+
+    assert cancel_registration(event_id, attendee) == (True, [queue[0]])
+    assert [get_waitlist_position(event_id, u) for u in (queue[2], queue[3])] == [1, 2]
+
+
+def test_inactive_events_do_not_promote():
+    event_id, attendee, queue = _full_event('wl_inactive', 1)
+    assert join_waitlist(event_id, queue[0])[0]
+
+    conn = get_db_connection()
+    conn.execute("UPDATE events SET is_active = 0 WHERE id = ?", (event_id,))
+    conn.commit()
+    conn.close()
+
+    assert cancel_registration(event_id, attendee) == (True, [])
+    assert get_waitlist_position(event_id, queue[0]) == 1
@@ -0,0 +1,62 @@
+import io
+import logging
+import threading
+
+import pytest
+
+from utils import warmup
+
+
+def _wait_for_warmup():
+    for thread in threading.enumerate():
+        if thread.name == "warmup":
+            thread.join(timeout=10)
+
+
+def test_failed_warmup_is_retried_and_success_is_final(monkeypatch):
+    calls = []
+
+    def flaky_fill_caches():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("cache backend down")
+
+    monkeypatch.setattr(warmup, "fill_caches", flaky_fill_caches)
+    monkeypatch.setattr(warmup, "_warmed", False)
+    monkeypatch.setattr(warmup, "_last_attempt", None)
+
+    assert warmup.start_warmup()
+    _wait_for_warmup()
+    assert not warmup._warmed
+
+    # Retried only after the back-off
+    assert not warmup.start_warmup()
+    monkeypatch.setattr(warmup, "WARMUP_RETRY_SECONDS", 0)
+    assert warmup.start_warmup()
+    _wait_for_warmup()
+    assert warmup._warmed
+    assert not warmup.start_warmup()
+    assert len(calls) == 2
+
+
+def test_warmup_report_reaches_the_app_log_handler(monkeypatch):
+    pytest.importorskip("streamlit")
+    from utils import app
+
+    app.setup_logging()
+    handler = logging.getLogger("utils").handlers[0]
+    stream = io.StringIO()
+    previous = handler.setStream(stream)
+
+    monkeypatch.setattr(warmup, "fill_caches", lambda: None)
+    monkeypatch.setattr(warmup, "_warmed", False)
+    monkeypatch.setattr(warmup, "_last_attempt", None)
+    try:
+        assert warmup.start_warmup()
+        _wait_for_warmup()
+    finally:
+        handler.setStream(previous)
+
+    report = [line for line in stream.getvalue().splitlines() if "Warm-up finished" in line]
+    assert len(report) == 1
+    assert "import pages:" in report[0] and "prime sqlite:" in report[0]
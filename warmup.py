@@ -0,0 +1,148 @@
+"""
+Process start-up warm-up.
+
+The first sessions after a deploy would otherwise pay for importing page
+modules, for reading the hot SQLite indexes off disk and for filling the
+shared caches. start_warmup() does all three, and clears out stale
+export files, in a background thread the first time app.py runs in a
+process, so no session waits for it. A failed warm-up is logged and
+tried again on a later run.
+
+Run with:  python warmup.py   (prints the report without starting the app)
+"""
+
+import logging
+import threading
+import time
+
+from utils.database import get_db_connection, version_bus
+from utils.page_registry import page_registry
+
+# Full scans of the indexes behind the busiest pages, so their pages are
+# in the OS cache before the first request needs them
+PRIME_QUERIES = (
+    "SELECT COUNT(*) FROM events INDEXED BY idx_events_upcoming WHERE is_active = 1",
+    "SELECT COUNT(*) FROM groups INDEXED BY idx_groups_member_count",
+    "SELECT COUNT(*) FROM group_members INDEXED BY idx_group_members_user",
+    "SELECT COUNT(*) FROM event_registrations INDEXED BY idx_event_registrations_user",
+    "SELECT COUNT(*) FROM event_reminders INDEXED BY idx_event_reminders_due",
+    "SELECT COUNT(*) FROM messages INDEXED BY idx_messages_receiver_unread",
+    "SELECT COUNT(*) FROM group_messages INDEXED BY idx_group_messages_group",
+    "SELECT COUNT(*) FROM data_versions",
+)
+
+WARMUP_RETRY_SECONDS = 60
+
+logger = logging.getLogger(__name__)
+
+_warmed = False
+_running = False
+_last_attempt = None
+_warm_lock = threading.Lock()
+
+
+def import_pages():
+    """Import every registered role page; returns {module: ms or error}"""
+    return page_registry.preload()
+
+
+def prime_sqlite():
+    """Read the hot indexes once so the first queries hit warm pages"""
+    conn = get_db_connection()
+    try:
+        for query in PRIME_QUERIES:
+            try:
+                conn.execute(query).fetchone()
+            except Exception as e:
+                logger.warning("Warm-up query skipped (%s): %s", e, query)
+    finally:
+        conn.close()
+
+
+def fill_caches():
+    """Load the shared (viewer-independent) cache entries of the hot pages"""
+    from utils.events import export_event_type_calendar, upcoming_events_page
+    from utils.groups import DISCOVER_SORTS, discover_groups_page
+
+    # user 0 has no registrations or bans, so only shared entries are kept
+    for window_days in (7, 30, 90, None):
+        upcoming_events_page(0, window_days=window_days)
+    for sort in DISCOVER_SORTS:
+        discover_groups_page(0, sort=sort)
+    export_event_type_calendar(None)
+    version_bus.versions('events', 'groups', 'event_calendar')
+
+
+def sweep_exports():
+    """Remove student export files left behind by sessions of earlier processes"""
+    from utils.students import sweep_export_files
+
+    return sweep_export_files()
+
+
+def run_warmup():
+    """Run every warm-up step; returns ([(step, ms)], True if every step succeeded)"""
+    report = []
+    ok = True
+
+    for step, fn in (("import pages", import_pages),
+                     ("prime sqlite", prime_sqlite),
+                     ("fill caches", fill_caches),
+                     ("sweep exports", sweep_exports)):
+        started = time.perf_counter()
+        try:
+            detail = fn()
+        except Exception:
+            logger.exception("Warm-up step '%s' failed", step)
+            ok = False
+            continue
+        report.append((step, round((time.perf_counter() - started) * 1000, 1)))
+
+        if step == "import pages":
+            for module, result in detail.items():
+                if not isinstance(result, float):
+                    logger.warning("Warm-up could not import %s: %s", module, result)
+
+    return report, ok
+
+
+def _warm_up():
+    global _warmed, _running
+    try:
+        report, ok = run_warmup()
+        total = sum(ms for _, ms in report)
+        logger.info("Warm-up finished in %.0f ms (%s)", total,
+                    ", ".join(f"{step}: {ms:.0f} ms" for step, ms in report))
+    except Exception:
+        logger.exception("Warm-up failed")
+        ok = False
+
+    with _warm_lock:
+        _warmed = ok
+        _running = False
+
+
+def start_warmup():
+    """
+    Start the warm-up in a daemon thread unless it already ran, is running,
+    or failed less than WARMUP_RETRY_SECONDS ago. Never blocks the caller.
+    """
+    global _running, _last_attempt
+    with _warm_lock:
+        if _warmed or _running:
+            return False
+        if _last_attempt is not None and time.monotonic() - _last_attempt < WARMUP_RETRY_SECONDS:
+            return False
+        _running = True
+        _last_attempt = time.monotonic()
+
+    threading.Thread(target=_warm_up, name="warmup", daemon=True).start()
+    return True
+
+
+if __name__ == "__main__":
+    from utils.database import init_db
+
+    logging.basicConfig(level=logging.INFO)
+    init_db()
+    _warm_up()